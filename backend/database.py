@@ -1,10 +1,182 @@
-from sqlalchemy import create_engine
+import functools
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.sql.dml import UpdateBase
 from config import settings
+from middleware.admission import admission_controller
 
-engine = create_engine(settings.MYSQL_URL, pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+class MonitoredQueuePool(QueuePool):
+    """QueuePool that reports threads waiting for a connection, and checkout timeouts, to admission control"""
+
+    controller = admission_controller
+
+    def _do_get(self):
+        self.controller.checkout_started()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.controller.observe_pool_timeout()
+            raise
+        finally:
+            self.controller.checkout_finished()
+
+
+engine = create_engine(settings.MYSQL_URL, pool_pre_ping=True, poolclass=MonitoredQueuePool)
+admission_controller.watch_pool(lambda: engine.pool)
+
+
+class ReplicaPool:
+    """Read replicas with periodic health checks; unhealthy replicas are skipped"""
+
+    def __init__(self, urls: List[str], check_interval: float):
+        self.engines = [create_engine(url, pool_pre_ping=True) for url in urls]
+        self.check_interval = check_interval
+        self._healthy = [True] * len(self.engines)
+        self._checked_at = [0.0] * len(self.engines)
+        self._cycle = itertools.cycle(range(len(self.engines))) if self.engines else None
+        self._lock = threading.Lock()
+
+    def _check(self, index: int) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked_at[index] < self.check_interval:
+                return self._healthy[index]
+            self._checked_at[index] = now
+
+        try:
+            with self.engines[index].connect() as conn:
+                conn.execute(text("SELECT 1"))
+            healthy = True
+        except Exception:
+            healthy = False
+        self._healthy[index] = healthy
+        return healthy
+
+    def choose(self) -> Optional[Engine]:
+        """Next healthy replica in round-robin order, or None to fall back to the primary"""
+        if not self.engines:
+            return None
+        for _ in range(len(self.engines)):
+            with self._lock:
+                index = next(self._cycle)
+            if self._check(index):
+                return self.engines[index]
+        return None
+
+
+class StickyWrites:
+    """Remembers recent writers so their reads stay on the primary (read-your-writes)"""
+
+    def __init__(self, window: float):
+        self.window = window
+        self._until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, key: str) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._until[key] = now + self.window
+            if len(self._until) > 10000:
+                self._until = {k: v for k, v in self._until.items() if v > now}
+
+    def is_sticky(self, key: Optional[str]) -> bool:
+        if key is None:
+            return False
+        with self._lock:
+            return self._until.get(key, 0.0) > time.monotonic()
+
+
+replicas = ReplicaPool(
+    [url.strip() for url in settings.MYSQL_REPLICA_URLS.split(",") if url.strip()],
+    settings.REPLICA_HEALTH_CHECK_INTERVAL_SECONDS
+)
+sticky_writes = StickyWrites(settings.READ_YOUR_WRITES_SECONDS)
+
+
+class RoutingSession(Session):
+    """
+    Session that sends reads from read-only repository methods to a replica.
+
+    Everything else - flushes, DML, and reads inside write methods - uses the
+    primary. So do all reads for a session that has written recently, or
+    whose sticky key (the user ID) wrote recently from any session.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.info["wrote"] = True
+            return engine
+        if (
+            self.info.get("route") != "replica"
+            or self.info.get("wrote")
+            or self.info.get("primary_until", 0.0) > time.monotonic()
+            or sticky_writes.is_sticky(self.info.get("sticky_key"))
+        ):
+            return engine
+
+        # Pin one replica per session so a transaction reads a single snapshot
+        replica = self.info.get("replica")
+        if replica is None:
+            replica = self.info["replica"] = replicas.choose()
+        return replica or engine
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _remember_writer(session):
+    if not session.info.pop("wrote", False):
+        return
+    session.info["primary_until"] = time.monotonic() + sticky_writes.window
+    if session.info.get("sticky_key"):
+        sticky_writes.mark(session.info["sticky_key"])
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _forget_write(session):
+    session.info.pop("wrote", None)
+
+
+@contextmanager
+def route_to(session: Session, target: str):
+    """Route the enclosed queries to "primary" or "replica"; the outermost route wins"""
+    if "route" in session.info:
+        yield
+        return
+    session.info["route"] = target
+    try:
+        yield
+    finally:
+        session.info.pop("route", None)
+
+
+def read_only(method):
+    """Repository method decorator: reads may be served by a replica"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with route_to(self.db, "replica"):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def writes(method):
+    """Repository method decorator: the method and the reads it makes use the primary"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with route_to(self.db, "primary"):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
@@ -18,6 +190,27 @@ def get_db():
         db.close()
 
 
+@contextmanager
+def advisory_lock(name: str):
+    """
+    Hold a named MySQL lock (GET_LOCK) for the block, without waiting for it.
+    
+    Yields whether the lock was acquired. The lock belongs to one pooled
+    connection, so the server drops it if the holder dies. Other databases
+    are single-host, so the lock is always granted.
+    """
+    if engine.dialect.name != "mysql":
+        yield True
+        return
+    with engine.connect() as conn:
+        acquired = conn.execute(text("SELECT GET_LOCK(:name, 0)"), {"name": name}).scalar() == 1
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": name})
+
+
 def init_db():
     """Initialize database tables"""
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
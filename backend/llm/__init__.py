@@ -1,4 +1,23 @@
 from .interface import LLMProvider
 from .requestyai_provider import RequestYaiProvider
+from .registry import register_provider, create_provider, available_providers
+from .routing import (
+    ProviderRouter,
+    RoutedTranscription,
+    TranscriptionError,
+    LatencyTracker,
+    get_provider_router,
+)
 
-__all__ = ["LLMProvider", "RequestYaiProvider"]
\ No newline at end of file
+__all__ = [
+    "LLMProvider",
+    "RequestYaiProvider",
+    "register_provider",
+    "create_provider",
+    "available_providers",
+    "ProviderRouter",
+    "RoutedTranscription",
+    "TranscriptionError",
+    "LatencyTracker",
+    "get_provider_router",
+]
\ No newline at end of file
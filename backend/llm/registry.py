@@ -0,0 +1,33 @@
+from typing import Callable, Dict, List
+from .interface import LLMProvider
+from .requestyai_provider import RequestYaiProvider
+
+
+_PROVIDERS: Dict[str, Callable[[], LLMProvider]] = {}
+
+
+def register_provider(name: str, factory: Callable[[], LLMProvider]) -> None:
+    """
+    Register an LLM provider factory under a name.
+
+    Args:
+        name: Name used in LLM_PROVIDER and stored on Recording.llm_provider
+        factory: Zero-argument callable returning an LLMProvider
+    """
+    _PROVIDERS[name] = factory
+
+
+def create_provider(name: str) -> LLMProvider:
+    """Instantiate a registered provider by name"""
+    factory = _PROVIDERS.get(name)
+    if factory is None:
+        raise ValueError(f"Unknown LLM provider: {name}")
+    return factory()
+
+
+def available_providers() -> List[str]:
+    """List the names of all registered providers"""
+    return list(_PROVIDERS)
+
+
+register_provider("requestyai", RequestYaiProvider)
@@ -0,0 +1,199 @@
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Deque, Dict, List, Optional, Tuple
+from config import settings
+from .interface import LLMProvider
+from .registry import create_provider
+
+
+class TranscriptionError(Exception):
+    """Raised when every routed provider failed to transcribe"""
+
+    def __init__(self, errors: List[Tuple[str, Exception]]):
+        self.errors = errors
+        details = "; ".join(f"{name}: {error}" for name, error in errors)
+        super().__init__(f"All LLM providers failed ({details})")
+
+
+@dataclass
+class RoutedTranscription:
+    """Transcription text together with the provider that served it"""
+    text: str
+    provider: str
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies per provider"""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(name, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, name: str, pct: float) -> Optional[float]:
+        """Return the given percentile of observed latencies, or None without samples"""
+        with self._lock:
+            samples = sorted(self._samples.get(name, ()))
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(round(pct / 100.0 * (len(samples) - 1))))
+        return samples[index]
+
+    def count(self, name: str) -> int:
+        with self._lock:
+            return len(self._samples.get(name, ()))
+
+
+class ProviderRouter:
+    """
+    Routes transcription requests across several LLM providers.
+
+    Policies:
+        failover: try providers one after another until one succeeds
+        hedged:   like failover, but also start the next provider once the
+                  current one has run longer than its observed p95 latency
+
+    When weights are given, the primary provider for each request is chosen
+    by weighted random selection; the remaining providers keep their order.
+    """
+
+    POLICIES = ("failover", "hedged")
+
+    def __init__(
+        self,
+        providers: Dict[str, LLMProvider],
+        policy: str = "failover",
+        weights: Optional[Dict[str, float]] = None,
+        hedge_min_samples: int = 20,
+        hedge_default_delay: float = 10.0,
+        latency_tracker: Optional[LatencyTracker] = None,
+        max_workers: int = 8,
+    ):
+        if not providers:
+            raise ValueError("At least one LLM provider is required")
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown routing policy: {policy}")
+
+        self.providers = providers
+        self.policy = policy
+        self.weights = weights or {}
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_default_delay = hedge_default_delay
+        self.latency = latency_tracker or LatencyTracker()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-hedge")
+
+    def provider_order(self) -> List[str]:
+        """Return the providers to try for one request, primary first"""
+        names = list(self.providers)
+        weighted = [n for n in names if self.weights.get(n, 0) > 0]
+        if len(weighted) > 1:
+            primary = random.choices(weighted, weights=[self.weights[n] for n in weighted])[0]
+            names.remove(primary)
+            names.insert(0, primary)
+        return names
+
+    def hedge_delay(self, name: str) -> float:
+        """Seconds to wait on a provider before hedging to the next one"""
+        if self.latency.count(name) < self.hedge_min_samples:
+            return self.hedge_default_delay
+        return self.latency.percentile(name, 95)
+
+    def _call(self, name: str, audio_path: str) -> str:
+        started = time.monotonic()
+        text = self.providers[name].transcribe_audio(audio_path)
+        self.latency.record(name, time.monotonic() - started)
+        return text
+
+    def transcribe(self, audio_path: str) -> RoutedTranscription:
+        """
+        Transcribe audio using the configured routing policy.
+
+        Returns:
+            RoutedTranscription with the text and the provider that served it
+
+        Raises:
+            TranscriptionError: if every provider failed
+        """
+        order = self.provider_order()
+        if self.policy == "hedged" and len(order) > 1:
+            return self._transcribe_hedged(audio_path, order)
+        return self._transcribe_failover(audio_path, order)
+
+    def transcribe_audio(self, audio_path: str) -> str:
+        """LLMProvider-compatible entry point"""
+        return self.transcribe(audio_path).text
+
+    def _transcribe_failover(self, audio_path: str, order: List[str]) -> RoutedTranscription:
+        errors = []
+        for name in order:
+            try:
+                return RoutedTranscription(text=self._call(name, audio_path), provider=name)
+            except Exception as e:
+                errors.append((name, e))
+        raise TranscriptionError(errors)
+
+    def _transcribe_hedged(self, audio_path: str, order: List[str]) -> RoutedTranscription:
+        remaining = list(order)
+        in_flight = {}
+        errors = []
+        last_launched = None
+
+        def launch():
+            nonlocal last_launched
+            last_launched = remaining.pop(0)
+            in_flight[self._executor.submit(self._call, last_launched, audio_path)] = last_launched
+
+        launch()
+        while in_flight:
+            timeout = self.hedge_delay(last_launched) if remaining else None
+            done, _ = wait(list(in_flight), timeout=timeout, return_when=FIRST_COMPLETED)
+
+            if not done:
+                # Slower than its p95: fire the next provider alongside it
+                launch()
+                continue
+
+            for future in done:
+                name = in_flight.pop(future)
+                try:
+                    return RoutedTranscription(text=future.result(), provider=name)
+                except Exception as e:
+                    errors.append((name, e))
+
+            if not in_flight and remaining:
+                launch()
+
+        raise TranscriptionError(errors)
+
+
+def parse_weights(spec: str) -> Dict[str, float]:
+    """Parse a weight spec such as "requestyai=3,other=1" """
+    weights = {}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+@lru_cache(maxsize=None)
+def get_provider_router() -> ProviderRouter:
+    """Build the process-wide provider router from settings"""
+    names = [n.strip() for n in settings.LLM_PROVIDER.split(",") if n.strip()]
+    return ProviderRouter(
+        providers={name: create_provider(name) for name in names},
+        policy=settings.LLM_ROUTING_POLICY,
+        weights=parse_weights(settings.LLM_PROVIDER_WEIGHTS),
+        hedge_min_samples=settings.LLM_HEDGE_MIN_SAMPLES,
+        hedge_default_delay=settings.LLM_HEDGE_DEFAULT_DELAY_SECONDS,
+    )
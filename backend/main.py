@@ -1,10 +1,18 @@
 import os
-from fastapi import FastAPI
+from contextlib import nullcontext
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 from config import settings
-from database import init_db
-from routers import auth_router, recordings_router
+from database import advisory_lock, init_db
+from middleware import AdmissionMiddleware, CompressionMiddleware, ProfilingMiddleware, admission_controller
+from routers import auth_router, recordings_router, usage_router, admin_router
+from repositories.dependencies import open_recording_repository, use_memory_backend
+from services.recording_service import RecordingService
+from services.maintenance_service import MaintenanceService, MaintenanceWorker
+from llm.routing import get_provider_router
 
 # Create FastAPI app
 app = FastAPI(
@@ -16,6 +24,16 @@ app = FastAPI(
 # Add session middleware for OAuth
 app.add_middleware(SessionMiddleware, secret_key=settings.JWT_SECRET)
 
+# Shed ingest load before it reaches the database; inside CORS so rejections carry CORS headers
+app.add_middleware(AdmissionMiddleware, controller=admission_controller)
+
+# Sampled or token-triggered request profiling; inside compression so compressing isn't
+# profiled, but outside admission and sessions, whose time counts toward the request
+app.add_middleware(ProfilingMiddleware)
+
+# Compress large transcript payloads (gzip, or brotli when installed)
+app.add_middleware(CompressionMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -25,9 +43,37 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# A request that gave up waiting for a database connection is shed like admission rejections
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Database is saturated"},
+        headers={"Retry-After": str(admission_controller.retry_after)},
+    )
+
+
+def create_maintenance_service():
+    """Build a maintenance service bound to a fresh repository for one pass"""
+    recording_repo, close = open_recording_repository()
+    recording_service = RecordingService(recording_repo, get_provider_router())
+    return MaintenanceService(recording_repo, recording_service), close
+
+
+def maintenance_lock():
+    """Let one process at a time run maintenance; in-memory stores are per process"""
+    if use_memory_backend():
+        return nullcontext(True)
+    return advisory_lock("scribe-maintenance")
+
+
+maintenance_worker = MaintenanceWorker(create_maintenance_service, lock=maintenance_lock)
+
 # Include routers
 app.include_router(auth_router)
 app.include_router(recordings_router)
+app.include_router(usage_router)
+app.include_router(admin_router)
 
 
 @app.on_event("startup")
@@ -37,8 +83,21 @@ async def startup_event():
     os.makedirs(settings.AUDIO_STORAGE_PATH, exist_ok=True)
     
     # Initialize database tables
-    init_db()
-    print("Database initialized successfully")
+    if use_memory_backend():
+        print("Using in-memory repositories; data is lost on restart")
+    else:
+        init_db()
+        print("Database initialized successfully")
+    
+    # Start the stale-recording reaper and storage garbage collector
+    if settings.MAINTENANCE_ENABLED:
+        maintenance_worker.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background maintenance"""
+    maintenance_worker.stop()
 
 
 @app.get("/")
@@ -55,7 +114,12 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy"}
+    last_report = maintenance_worker.last_report
+    return {
+        "status": "healthy",
+        "admission": admission_controller.snapshot(),
+        "maintenance": last_report.to_dict() if last_report else None
+    }
 
 
 if __name__ == "__main__":
@@ -0,0 +1,8 @@
+from .admission import AdmissionController, AdmissionMiddleware, admission_controller
+from .compression import CompressionMiddleware
+from .profiling import ProfileStore, ProfilingMiddleware, profile_store
+
+__all__ = [
+    "AdmissionController", "AdmissionMiddleware", "admission_controller", "CompressionMiddleware",
+    "ProfileStore", "ProfilingMiddleware", "profile_store"
+]
\ No newline at end of file
@@ -0,0 +1,230 @@
+import json
+import re
+import shutil
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+from sqlalchemy.pool import Pool, QueuePool
+from config import settings
+
+
+# Request classes in priority order; lower-priority work is shed first
+FINISH = "finish"
+CHUNK = "chunk"
+CREATE = "create"
+
+ROUTES = [
+    (re.compile(r"^/recordings/[^/]+/finish/?$"), FINISH),
+    (re.compile(r"^/recordings/[^/]+/chunks/?$"), CHUNK),
+    (re.compile(r"^/recordings/?$"), CREATE),
+]
+
+
+class AdmissionController:
+    """
+    Tracks load signals and decides whether to admit ingest requests.
+
+    Signals:
+        in-flight chunk uploads, pending transcriptions (in-flight finishes),
+        primary database pool pressure (connections checked out, threads
+        waiting for one, recent checkout timeouts) and free disk space.
+
+    Finishes and chunk uploads are admitted up to the full limits; creating
+    a new recording is only admitted while every signal is below
+    `create_headroom` of its limit, so accepted recordings keep capacity.
+    """
+
+    def __init__(
+        self,
+        max_inflight_uploads: int = None,
+        max_pending_transcriptions: int = None,
+        max_pool_waiters: int = None,
+        min_free_disk_bytes: int = None,
+        create_headroom: float = None,
+        retry_after: int = None,
+        storage_path: str = None,
+        signal_ttl: float = 5.0,
+    ):
+        self.max_inflight_uploads = max_inflight_uploads or settings.ADMISSION_MAX_INFLIGHT_UPLOADS
+        self.max_pending_transcriptions = max_pending_transcriptions or settings.ADMISSION_MAX_PENDING_TRANSCRIPTIONS
+        self.max_pool_waiters = max_pool_waiters or settings.ADMISSION_MAX_POOL_WAITERS
+        self.min_free_disk_bytes = (
+            min_free_disk_bytes if min_free_disk_bytes is not None
+            else settings.ADMISSION_MIN_FREE_DISK_MB * 1024 * 1024
+        )
+        self.create_headroom = create_headroom or settings.ADMISSION_CREATE_HEADROOM
+        self.retry_after = retry_after or settings.ADMISSION_RETRY_AFTER_SECONDS
+        self.storage_path = storage_path or settings.AUDIO_STORAGE_PATH
+        self.signal_ttl = signal_ttl
+
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, int] = {FINISH: 0, CHUNK: 0, CREATE: 0}
+        self._pool_source: Optional[Callable[[], Pool]] = None
+        self._pool_waiters = 0
+        self._pool_timeout_at: Optional[float] = None
+        self._free_disk: Optional[int] = None
+        self._free_disk_at = 0.0
+
+    def watch_pool(self, pool_source: Callable[[], Pool]) -> None:
+        """Read connection usage from the pool returned by `pool_source` (it changes on dispose)"""
+        self._pool_source = pool_source
+
+    def checkout_started(self) -> None:
+        """A thread is waiting to check out a database connection"""
+        with self._lock:
+            self._pool_waiters += 1
+
+    def checkout_finished(self) -> None:
+        with self._lock:
+            self._pool_waiters -= 1
+
+    def observe_pool_timeout(self) -> None:
+        """Record that a checkout gave up waiting for a connection"""
+        with self._lock:
+            self._pool_timeout_at = time.monotonic()
+
+    def pool_pressure(self) -> dict:
+        """
+        Current pool pressure, measured rather than smoothed so that an
+        exhausted pool keeps reporting as exhausted.
+
+        Returns:
+            in_use and capacity (None when unbounded or not a QueuePool),
+            waiters blocked in checkout, and whether a checkout timed out
+            within the last `signal_ttl` seconds
+        """
+        in_use, capacity = None, None
+        pool = self._pool_source() if self._pool_source else None
+        if isinstance(pool, QueuePool):
+            in_use = pool.checkedout()
+            if pool._max_overflow >= 0:
+                capacity = pool.size() + pool._max_overflow
+        with self._lock:
+            waiters = self._pool_waiters
+            timed_out = (
+                self._pool_timeout_at is not None
+                and time.monotonic() - self._pool_timeout_at < self.signal_ttl
+            )
+        return {"in_use": in_use, "capacity": capacity, "waiters": waiters, "timed_out": timed_out}
+
+    def free_disk(self) -> Optional[int]:
+        """Free bytes on the audio storage volume, refreshed at most once a second"""
+        now = time.monotonic()
+        if self._free_disk is None or now - self._free_disk_at >= 1.0:
+            try:
+                self._free_disk = shutil.disk_usage(self.storage_path).free
+            except OSError:
+                self._free_disk = None
+            self._free_disk_at = now
+        return self._free_disk
+
+    def check(self, request_class: str) -> Optional[Tuple[int, str]]:
+        """
+        Decide whether a request may proceed.
+
+        Returns:
+            None to admit, or (status code, reason) to shed
+        """
+        share = self.create_headroom if request_class == CREATE else 1.0
+
+        with self._lock:
+            uploads = self._inflight[CHUNK]
+            transcriptions = self._inflight[FINISH]
+
+        if request_class == CHUNK and uploads >= self.max_inflight_uploads:
+            return 429, "Too many chunk uploads in flight"
+        if request_class == FINISH and transcriptions >= self.max_pending_transcriptions:
+            return 429, "Too many transcriptions pending"
+        if request_class == CREATE and (
+            uploads >= self.max_inflight_uploads * share
+            or transcriptions >= self.max_pending_transcriptions * share
+        ):
+            return 503, "Not accepting new recordings while under load"
+
+        pool = self.pool_pressure()
+        if pool["timed_out"] or pool["waiters"] >= self.max_pool_waiters * share:
+            return 503, "Database is saturated"
+        if request_class == CREATE and pool["capacity"] and pool["in_use"] >= pool["capacity"] * share:
+            return 503, "Not accepting new recordings while under load"
+
+        free = self.free_disk()
+        if free is not None and free < self.min_free_disk_bytes / share:
+            return 503, "Audio storage is nearly full"
+
+        return None
+
+    def try_acquire(self, request_class: str) -> Optional[Tuple[int, str]]:
+        """Check admission and, if admitted, count the request as in flight"""
+        rejection = self.check(request_class)
+        if rejection is None:
+            with self._lock:
+                self._inflight[request_class] += 1
+        return rejection
+
+    def release(self, request_class: str) -> None:
+        with self._lock:
+            self._inflight[request_class] -= 1
+
+    def snapshot(self) -> dict:
+        """Current load signals, for health reporting"""
+        with self._lock:
+            inflight = dict(self._inflight)
+        return {
+            "inflight": inflight,
+            "pool": self.pool_pressure(),
+            "free_disk_bytes": self.free_disk(),
+        }
+
+
+admission_controller = AdmissionController()
+
+
+def classify(method: str, path: str) -> Optional[str]:
+    """Map an ingest request to its admission class, or None if not controlled"""
+    if method != "POST":
+        return None
+    for pattern, request_class in ROUTES:
+        if pattern.match(path):
+            return request_class
+    return None
+
+
+class AdmissionMiddleware:
+    """ASGI middleware that sheds ingest requests before their body is read"""
+
+    def __init__(self, app, controller: AdmissionController = None):
+        self.app = app
+        self.controller = controller or admission_controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_class = classify(scope["method"], scope["path"])
+        if request_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        rejection = self.controller.try_acquire(request_class)
+        if rejection is not None:
+            await self._reject(send, *rejection)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(request_class)
+
+    async def _reject(self, send, status_code: int, reason: str) -> None:
+        body = json.dumps({"detail": reason}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", str(self.controller.retry_after).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
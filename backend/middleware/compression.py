@@ -0,0 +1,106 @@
+import gzip
+from typing import Optional
+from config import settings
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; fall back to gzip only
+    brotli = None
+
+
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the best supported encoding from an Accept-Encoding header"""
+    offered = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        offered[name.strip().lower()] = quality
+
+    if brotli is not None and offered.get("br", 0) > 0:
+        return "br"
+    if offered.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing single-body JSON/text responses above a size threshold.
+
+    Every single-body JSON/text response carries `Vary: Accept-Encoding`,
+    compressed or not, so caches never hand an encoding to a client that did
+    not ask for it. Streaming responses (exports) and already-encoded bodies
+    pass through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = None, gzip_level: int = 6, brotli_quality: int = 5):
+        self.app = app
+        self.minimum_size = minimum_size or settings.COMPRESSION_MIN_SIZE
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict((k.lower(), v) for k, v in scope.get("headers", []))
+        encoding = choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            passthrough = True
+            body = message.get("body", b"")
+            response_headers = dict((k.lower(), v) for k, v in start_message["headers"])
+            content_type = response_headers.get(b"content-type", b"").decode("latin-1")
+
+            if (
+                message.get("more_body", False)
+                or b"content-encoding" in response_headers
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            ):
+                await send(start_message)
+                await send(message)
+                return
+
+            new_headers = [
+                (k, v) for k, v in start_message["headers"]
+                if k.lower() != b"vary"
+            ]
+            vary = response_headers.get(b"vary")
+            new_headers.append((b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"))
+
+            if encoding is not None and len(body) >= self.minimum_size:
+                body = self.compress(body, encoding)
+                new_headers = [(k, v) for k, v in new_headers if k.lower() != b"content-length"]
+                new_headers += [
+                    (b"content-encoding", encoding.encode("latin-1")),
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                ]
+            await send({**start_message, "headers": new_headers})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
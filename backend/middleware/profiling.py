@@ -0,0 +1,316 @@
+import asyncio
+import contextvars
+import os
+import random
+import secrets
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+import anyio.to_thread
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from config import settings
+
+
+PROFILE_HEADER = "x-profile-token"
+
+# Leaf frames in these files are threads waiting for work, not doing it
+IDLE_FILES = ("threading.py", "selectors.py", "queue.py")
+
+_active_profile: contextvars.ContextVar[Optional["RequestProfile"]] = contextvars.ContextVar(
+    "active_profile", default=None
+)
+
+
+class RequestProfile:
+    """
+    Stack samples and SQL statistics captured for one request.
+
+    Only the request's own work is sampled: the threadpool threads currently
+    running calls it made, and the event loop thread while one of its tasks
+    is the one running there.
+    """
+
+    def __init__(self, method: str, path: str):
+        self.id = uuid.uuid4().hex
+        self.method = method
+        self.path = path
+        self.started_at = datetime.utcnow()
+        self.status_code: Optional[int] = None
+        self.duration_ms = 0.0
+        self.samples = 0
+        self.stacks: Counter = Counter()
+        self.sql_count = 0
+        self.sql_ms = 0.0
+        self.sql_statements: Dict[str, List[float]] = {}
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.loop_thread: Optional[int] = None
+        self.tasks: Set[asyncio.Task] = set()
+        self.threads: Set[int] = set()
+        self._lock = threading.Lock()
+
+    def enter_task(self) -> None:
+        """Claim the running task (and its event loop thread) for this request"""
+        with self._lock:
+            self.loop = asyncio.get_running_loop()
+            self.loop_thread = threading.get_ident()
+            self.tasks.add(asyncio.current_task())
+
+    def enter_thread(self) -> None:
+        with self._lock:
+            self.threads.add(threading.get_ident())
+
+    def exit_thread(self) -> None:
+        with self._lock:
+            self.threads.discard(threading.get_ident())
+
+    def owns(self, thread_id: int) -> bool:
+        """True if the thread is doing this request's work right now"""
+        with self._lock:
+            if thread_id in self.threads:
+                return True
+            if thread_id != self.loop_thread:
+                return False
+            tasks = set(self.tasks)
+        return asyncio.current_task(self.loop) in tasks
+
+    def finish(self) -> None:
+        """Drop the task and thread references once sampling has stopped"""
+        with self._lock:
+            self.tasks.clear()
+            self.threads.clear()
+
+    def record_sql(self, statement: str, elapsed_ms: float) -> None:
+        with self._lock:
+            self.sql_count += 1
+            self.sql_ms += elapsed_ms
+            stats = self.sql_statements.setdefault(statement, [0, 0.0])
+            stats[0] += 1
+            stats[1] += elapsed_ms
+
+    def folded(self) -> str:
+        """Stacks in collapsed format (flamegraph.pl, speedscope, inferno)"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status_code": self.status_code,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration_ms, 2),
+            "samples": self.samples,
+            "sql_count": self.sql_count,
+            "sql_ms": round(self.sql_ms, 2),
+        }
+
+    def detail(self, top: int = 20) -> dict:
+        with self._lock:
+            statements = sorted(self.sql_statements.items(), key=lambda item: item[1][1], reverse=True)
+        return {
+            **self.summary(),
+            "sql_statements": [
+                {"statement": sql, "count": count, "total_ms": round(total, 2)}
+                for sql, (count, total) in statements[:top]
+            ],
+        }
+
+
+class StackSampler(threading.Thread):
+    """
+    Samples the stacks of the threads working for one request at a fixed
+    interval until stopped, then hands the finished profile to the store from its own thread, so the
+    event loop never waits for it.
+    """
+
+    def __init__(self, profile: RequestProfile, interval: float, store: "ProfileStore"):
+        super().__init__(name=f"profiler-{profile.id[:8]}", daemon=True)
+        self.profile = profile
+        self.interval = interval
+        self.store = store
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop_event.wait(self.interval):
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or not self.profile.owns(thread_id):
+                    continue
+                if os.path.basename(frame.f_code.co_filename) in IDLE_FILES:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.profile.stacks[";".join(reversed(stack))] += 1
+            self.profile.samples += 1
+        self.profile.finish()
+        self.store.add(self.profile)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+
+class ProfileStore:
+    """Bounded ring buffer of recent request profiles"""
+
+    def __init__(self, size: int):
+        self._profiles: deque = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, profile: RequestProfile) -> None:
+        with self._lock:
+            self._profiles.append(profile)
+
+    def list(self) -> List[RequestProfile]:
+        with self._lock:
+            return list(reversed(self._profiles))
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        with self._lock:
+            return next((p for p in self._profiles if p.id == profile_id), None)
+
+
+profile_store = ProfileStore(settings.PROFILING_BUFFER_SIZE)
+
+
+def token_authorized(token: Optional[str]) -> bool:
+    """True if a debug token is configured and matches"""
+    return bool(settings.PROFILING_TOKEN) and bool(token) and secrets.compare_digest(
+        token, settings.PROFILING_TOKEN
+    )
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _active_profile.get() is not None:
+        conn.info.setdefault("profile_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _active_profile.get()
+    if profile is None:
+        return
+    starts = conn.info.get("profile_query_start")
+    if starts:
+        profile.record_sql(statement, (time.perf_counter() - starts.pop()) * 1000.0)
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute; drop its start time
+    if context.connection is None or context.execution_context is None:
+        return
+    starts = context.connection.info.get("profile_query_start")
+    if starts:
+        starts.pop()
+
+
+_run_sync = anyio.to_thread.run_sync
+
+
+async def _run_sync_profiled(func, *args, **kwargs):
+    """
+    anyio.to_thread.run_sync that registers the worker thread with the
+    active profile for the duration of the call.
+
+    Starlette's run_in_threadpool, sync dependencies and endpoints, and
+    iterate_in_threadpool all reach the threadpool through here.
+    """
+    profile = _active_profile.get()
+    if profile is None:
+        return await _run_sync(func, *args, **kwargs)
+    # Tasks the request spawns (e.g. a streaming response) share its context
+    profile.enter_task()
+
+    def call(*call_args):
+        profile.enter_thread()
+        try:
+            return func(*call_args)
+        finally:
+            profile.exit_thread()
+
+    return await _run_sync(call, *args, **kwargs)
+
+
+_listeners_installed = False
+
+
+def install_sql_listeners() -> None:
+    """
+    Attach SQL timing to every engine and threadpool registration to anyio;
+    both are a no-op check when no profile is active
+    """
+    global _listeners_installed
+    if _listeners_installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+    anyio.to_thread.run_sync = _run_sync_profiled
+    _listeners_installed = True
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles a sampled fraction of requests, or any request
+    carrying a valid X-Profile-Token header.
+
+    Profiled responses carry an X-Profile-Id header; the profile can then be
+    fetched from /admin/profiles. When PROFILING_SAMPLE_RATE is 0 and no token
+    is configured, requests pass straight through.
+    """
+
+    def __init__(self, app, store: ProfileStore = None):
+        self.app = app
+        self.store = store or profile_store
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+        self.interval = settings.PROFILING_SAMPLE_INTERVAL_MS / 1000.0
+        self.enabled = self.sample_rate > 0 or bool(settings.PROFILING_TOKEN)
+        if self.enabled:
+            install_sql_listeners()
+
+    def should_profile(self, scope) -> bool:
+        if scope["path"].startswith("/admin/profiles"):
+            return False
+        for key, value in scope.get("headers", []):
+            if key == PROFILE_HEADER.encode("latin-1"):
+                return token_authorized(value.decode("latin-1"))
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if not self.enabled or scope["type"] != "http" or not self.should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope["method"], scope["path"])
+        sampler = StackSampler(profile, self.interval, self.store)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                profile.status_code = message["status"]
+                message = {
+                    **message,
+                    "headers": list(message.get("headers", [])) + [(b"x-profile-id", profile.id.encode("latin-1"))],
+                }
+            await send(message)
+
+        token = _active_profile.set(profile)
+        profile.enter_task()
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profile.duration_ms = (time.perf_counter() - started) * 1000.0
+            _active_profile.reset(token)
+            # The sampler stores the profile once its current sample is done
+            sampler.stop()
@@ -1,5 +1,6 @@
 from .user import User
 from .recording import Recording
 from .recording_chunk import RecordingChunk
+from .usage_rollup import UsageRollup
 
-__all__ = ["User", "Recording", "RecordingChunk"]
\ No newline at end of file
+__all__ = ["User", "Recording", "RecordingChunk", "UsageRollup"]
\ No newline at end of file
@@ -1,26 +1,35 @@
-from sqlalchemy import Column, String, DateTime, Enum, Text, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, DateTime, Enum, Text, Float, Integer, ForeignKey, Index
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
-import uuid
 import enum
 from database import Base
+from .types import BinaryUUID, ChunkManifest, new_id
 
 
 class RecordingStatus(enum.Enum):
     active = "active"
     paused = "paused"
+    finishing = "finishing"
     ended = "ended"
+    failed = "failed"  # abandoned with none of its chunk audio left
 
 
 class Recording(Base):
     __tablename__ = "recordings"
+    __table_args__ = (
+        # Used by the stale-recording reaper
+        Index("ix_recordings_status_updated_at", "status", "updated_at"),
+    )
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(String(36), ForeignKey("users.id"), nullable=False, index=True)
+    id = Column(BinaryUUID, primary_key=True, default=new_id)
+    user_id = Column(BinaryUUID, ForeignKey("users.id"), nullable=False, index=True)
     status = Column(Enum(RecordingStatus), default=RecordingStatus.active, nullable=False)
     audio_file_path = Column(String(512), nullable=True)
     transcription_text = Column(Text, nullable=True)
     llm_provider = Column(String(50), default="requestyai", nullable=False)
+    duration_seconds = Column(Float, default=0.0, nullable=False)
+    version = Column(Integer, default=1, nullable=False)  # bumped on every write, used for ETags
+    chunk_manifest = deferred(Column(ChunkManifest, nullable=True))  # chunk metadata once ended; replaces the chunk rows
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
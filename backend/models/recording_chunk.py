@@ -1,18 +1,23 @@
-from sqlalchemy import Column, String, DateTime, Integer, Float, ForeignKey
+from sqlalchemy import Column, String, DateTime, Integer, Float, LargeBinary, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
-import uuid
 from database import Base
+from .types import BinaryUUID, new_id
 
 
 class RecordingChunk(Base):
     __tablename__ = "recording_chunks"
+    __table_args__ = (
+        # Chunk uploads are retried; each index is stored and billed once
+        UniqueConstraint("recording_id", "chunk_index", name="uq_recording_chunks_recording_index"),
+    )
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    recording_id = Column(String(36), ForeignKey("recordings.id"), nullable=False, index=True)
+    id = Column(BinaryUUID, primary_key=True, default=new_id)
+    recording_id = Column(BinaryUUID, ForeignKey("recordings.id"), nullable=False, index=True)
     chunk_index = Column(Integer, nullable=False)
     audio_blob_path = Column(String(512), nullable=False)
     duration_seconds = Column(Float, nullable=True)
+    peaks = Column(LargeBinary, nullable=True)  # packed int8 (min, max) pairs
     uploaded_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     # Relationships
@@ -0,0 +1,147 @@
+import math
+import os
+import struct
+import threading
+import time
+import uuid
+import zlib
+from datetime import datetime, timedelta
+from sqlalchemy.dialects import mysql
+from sqlalchemy.types import BINARY, LargeBinary, TypeDecorator
+
+
+_uuid7_lock = threading.Lock()
+_uuid7_last_ms = 0
+_uuid7_counter = 0
+
+
+def uuid7() -> uuid.UUID:
+    """
+    Generate a time-ordered UUIDv7 (RFC 9562).
+
+    The 48-bit millisecond timestamp leads, so consecutive keys land next to
+    each other in a clustered index. The 12-bit rand_a field is used as a
+    counter within the same millisecond to keep keys monotonic per process.
+    """
+    global _uuid7_last_ms, _uuid7_counter
+    with _uuid7_lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _uuid7_last_ms:
+            _uuid7_last_ms = ms
+            _uuid7_counter = int.from_bytes(os.urandom(2), "big") & 0x3FF
+        else:
+            ms = _uuid7_last_ms
+            _uuid7_counter += 1
+            if _uuid7_counter > 0xFFF:
+                # Counter exhausted: borrow the next millisecond
+                _uuid7_last_ms = ms = ms + 1
+                _uuid7_counter = 0
+        counter = _uuid7_counter
+
+    rand_b = int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+    value = (ms & ((1 << 48) - 1)) << 80 | 0x7 << 76 | counter << 64 | 0b10 << 62 | rand_b
+    return uuid.UUID(int=value)
+
+
+def new_id() -> str:
+    """Default for primary keys: a UUIDv7 in its canonical string form"""
+    return str(uuid7())
+
+
+class BinaryUUID(TypeDecorator):
+    """
+    Stores UUIDs as BINARY(16) while exposing them as canonical strings.
+
+    Values that are not valid UUIDs bind as NULL, so lookups with a malformed
+    ID simply match nothing instead of raising.
+    """
+
+    impl = BINARY(16)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return value.bytes
+        try:
+            return uuid.UUID(str(value)).bytes
+        except ValueError:
+            return None
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return str(uuid.UUID(bytes=bytes(value)))
+
+
+_EPOCH = datetime(1970, 1, 1)
+_MANIFEST_VERSION = 1
+_MANIFEST_HEADER = struct.Struct("<BI")
+_MANIFEST_ENTRY = struct.Struct("<16siqdHI")
+
+
+class ChunkManifest(TypeDecorator):
+    """
+    Chunk metadata of an ended recording, packed into one compressed blob.
+
+    Exposed as a list of dicts with the RecordingChunk column names (id,
+    chunk_index, audio_blob_path, duration_seconds, peaks, uploaded_at).
+    Each entry is a fixed header followed by the path and the peaks bytes;
+    zlib then folds away the repeated directory prefix of the paths.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        # BLOB caps at 64 KB; an hour of peaks alone is several hundred KB
+        if dialect.name == "mysql":
+            return dialect.type_descriptor(mysql.MEDIUMBLOB())
+        return dialect.type_descriptor(LargeBinary())
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        parts = [_MANIFEST_HEADER.pack(_MANIFEST_VERSION, len(value))]
+        for entry in value:
+            path = entry["audio_blob_path"].encode("utf-8")
+            peaks = entry.get("peaks") or b""
+            duration = entry.get("duration_seconds")
+            parts.append(_MANIFEST_ENTRY.pack(
+                uuid.UUID(entry["id"]).bytes,
+                entry["chunk_index"],
+                (entry["uploaded_at"] - _EPOCH) // timedelta(microseconds=1),
+                math.nan if duration is None else duration,
+                len(path),
+                len(peaks),
+            ))
+            parts.append(path)
+            parts.append(peaks)
+        return zlib.compress(b"".join(parts))
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        data = zlib.decompress(value)
+        version, count = _MANIFEST_HEADER.unpack_from(data, 0)
+        if version != _MANIFEST_VERSION:
+            raise ValueError(f"Unsupported chunk manifest version {version}")
+        offset = _MANIFEST_HEADER.size
+        entries = []
+        for _ in range(count):
+            id_bytes, chunk_index, micros, duration, path_len, peaks_len = _MANIFEST_ENTRY.unpack_from(data, offset)
+            offset += _MANIFEST_ENTRY.size
+            path = data[offset:offset + path_len].decode("utf-8")
+            offset += path_len
+            peaks = data[offset:offset + peaks_len]
+            offset += peaks_len
+            entries.append({
+                "id": str(uuid.UUID(bytes=id_bytes)),
+                "chunk_index": chunk_index,
+                "audio_blob_path": path,
+                "duration_seconds": None if math.isnan(duration) else duration,
+                "peaks": peaks or None,
+                "uploaded_at": _EPOCH + timedelta(microseconds=micros),
+            })
+        return entries
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Date, DateTime, Integer, Float, ForeignKey
+from datetime import datetime
+from database import Base
+from .types import BinaryUUID
+
+
+class UsageRollup(Base):
+    """Audio minutes per user per UTC day, maintained incrementally at chunk ingest"""
+    __tablename__ = "usage_rollups"
+
+    user_id = Column(BinaryUUID, ForeignKey("users.id"), primary_key=True)
+    usage_date = Column(Date, primary_key=True)
+    audio_seconds = Column(Float, default=0.0, nullable=False)
+    chunk_count = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -1,14 +1,14 @@
 from sqlalchemy import Column, String, DateTime
 from sqlalchemy.orm import relationship
 from datetime import datetime
-import uuid
 from database import Base
+from .types import BinaryUUID, new_id
 
 
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(BinaryUUID, primary_key=True, default=new_id)
     google_id = Column(String(255), unique=True, nullable=False, index=True)
     email = Column(String(255), nullable=False)
     display_name = Column(String(255), nullable=True)
@@ -1,9 +1,18 @@
 from .interfaces import UserRepository, RecordingRepository
 from .mysql_repository import MySQLUserRepository, MySQLRecordingRepository
+from .memory_repository import InMemoryStore, InMemoryUserRepository, InMemoryRecordingRepository, memory_store
+from .dependencies import get_user_repository, get_recording_repository, open_recording_repository
 
 __all__ = [
     "UserRepository",
     "RecordingRepository",
     "MySQLUserRepository",
     "MySQLRecordingRepository",
+    "InMemoryStore",
+    "InMemoryUserRepository",
+    "InMemoryRecordingRepository",
+    "memory_store",
+    "get_user_repository",
+    "get_recording_repository",
+    "open_recording_repository",
 ]
\ No newline at end of file
@@ -0,0 +1,48 @@
+from typing import Callable, Optional, Tuple
+from fastapi import Depends
+from sqlalchemy.orm import Session
+from config import settings
+from database import SessionLocal, get_db
+from .interfaces import UserRepository, RecordingRepository
+from .memory_repository import InMemoryUserRepository, InMemoryRecordingRepository, memory_store
+from .mysql_repository import MySQLUserRepository, MySQLRecordingRepository
+
+
+def use_memory_backend() -> bool:
+    return settings.REPOSITORY_BACKEND == "memory"
+
+
+def get_repository_session():
+    """Dependency for the request's database session; None with the in-memory backend"""
+    if use_memory_backend():
+        yield None
+        return
+    yield from get_db()
+
+
+def get_user_repository(db: Optional[Session] = Depends(get_repository_session)) -> UserRepository:
+    """Dependency for the configured UserRepository"""
+    if db is None:
+        return InMemoryUserRepository(memory_store)
+    return MySQLUserRepository(db)
+
+
+def get_recording_repository(db: Optional[Session] = Depends(get_repository_session)) -> RecordingRepository:
+    """Dependency for the configured RecordingRepository"""
+    if db is None:
+        return InMemoryRecordingRepository(memory_store)
+    return MySQLRecordingRepository(db)
+
+
+def open_recording_repository() -> Tuple[RecordingRepository, Callable[[], None]]:
+    """
+    Build a RecordingRepository outside a request, e.g. for streamed
+    responses and background work.
+
+    Returns:
+        (repository, close callback)
+    """
+    if use_memory_backend():
+        return InMemoryRecordingRepository(memory_store), lambda: None
+    db = SessionLocal()
+    return MySQLRecordingRepository(db), db.close
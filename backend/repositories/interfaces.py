@@ -1,5 +1,7 @@
-from typing import Protocol, List, Optional
-from models import User, Recording, RecordingChunk
+from datetime import date, datetime
+from typing import Protocol, Iterable, Iterator, List, Optional, Set, Tuple
+from models import User, Recording, RecordingChunk, UsageRollup
+from models.recording import RecordingStatus
 
 
 class UserRepository(Protocol):
@@ -33,22 +35,107 @@ class RecordingRepository(Protocol):
         """Get recording by ID"""
         ...
     
+    def get_recording_version(self, recording_id: str) -> Optional[Tuple[str, int]]:
+        """Get (user_id, version) for a recording without loading the row"""
+        ...
+    
+    def get_collection_version(self, user_id: str) -> Tuple[int, int, Optional[datetime]]:
+        """(recording count, sum of recording versions, latest updated_at); moves on any write to a listed field"""
+        ...
+    
     def list_recordings(self, user_id: str) -> List[Recording]:
         """List all recordings for a user"""
         ...
     
-    def add_chunk(self, recording_id: str, chunk_index: int, chunk_path: str, duration: Optional[float] = None) -> RecordingChunk:
-        """Add a chunk to a recording"""
+    def iter_recordings(self, user_id: str, start: Optional[date] = None, end: Optional[date] = None, batch_size: int = 100) -> Iterator[Recording]:
+        """Iterate a user's recordings created within [start, end], fetched in batches"""
+        ...
+    
+    def add_chunk(self, recording_id: str, chunk_index: int, chunk_path: str, duration: Optional[float] = None, peaks: Optional[bytes] = None) -> RecordingChunk:
+        """
+        Add a chunk to a recording and update its duration total and the daily usage rollup.
+        
+        Idempotent on (recording_id, chunk_index): a retried upload returns the
+        stored chunk without counting its duration again.
+        """
+        ...
+    
+    def get_usage(self, user_id: str, start: Optional[date] = None, end: Optional[date] = None) -> List[UsageRollup]:
+        """Get a user's daily usage rollups within [start, end]"""
         ...
     
     def get_chunks(self, recording_id: str) -> List[RecordingChunk]:
-        """Get all chunks for a recording"""
+        """Get all chunks for a recording, ordered by index; ended recordings read them from the chunk manifest"""
+        ...
+    
+    def get_chunk(self, recording_id: str, chunk_index: int) -> Optional[RecordingChunk]:
+        """Get one chunk of a recording by index"""
+        ...
+    
+    def compact_chunks(self, recording_id: str) -> int:
+        """Move an ended recording's remaining chunk rows into its manifest; returns the rows moved"""
+        ...
+    
+    def list_uncompacted_recordings(self, limit: int) -> List[str]:
+        """IDs of ended recordings that still have chunk rows"""
+        ...
+    
+    def refresh_recording(self, recording_id: str) -> Optional[Recording]:
+        """Re-read a recording outside the current transaction snapshot, without committing it"""
+        ...
+    
+    def release_connection(self) -> None:
+        """Return any pooled connection held by a read transaction before a long wait"""
+        ...
+    
+    def renew_finish(self, recording_id: str) -> bool:
+        """Extend the finishing lease; False once the recording is no longer finishing. Safe to call from another thread"""
+        ...
+    
+    def claim_finish(self, recording_id: str, stale_before: datetime) -> Optional[RecordingStatus]:
+        """Compare-and-set a recording into finishing; returns its previous status, or None if not claimed"""
+        ...
+    
+    def release_finish(self, recording_id: str, status: RecordingStatus) -> None:
+        """Return a recording from finishing to `status` after a failed finish"""
+        ...
+    
+    def list_stale_recordings(self, idle_before: datetime, lease_before: datetime, limit: int) -> List[Recording]:
+        """Unfinished recordings idle since `idle_before`, plus finishing ones whose lease expired"""
+        ...
+    
+    def delete_recording(self, recording_id: str) -> bool:
+        """Delete a recording and its chunk rows"""
+        ...
+    
+    def existing_recording_ids(self, recording_ids: Iterable[str]) -> Set[str]:
+        """Return the subset of the given IDs that have a recording row"""
+        ...
+    
+    def iter_chunk_files(self, batch_size: int = 500) -> Iterator[Tuple[str, str]]:
+        """Iterate (chunk_id, audio_blob_path) for chunk rows of recordings that have not ended"""
+        ...
+    
+    def delete_chunks(self, chunk_ids: List[str]) -> int:
+        """Delete chunk rows by ID"""
+        ...
+    
+    def iter_audio_files(self, batch_size: int = 500) -> Iterator[Tuple[str, str]]:
+        """Iterate (recording_id, audio_file_path) for recordings with assembled audio"""
+        ...
+    
+    def clear_audio_file(self, recording_id: str) -> None:
+        """Drop a recording's reference to a missing assembled audio file"""
         ...
     
     def mark_paused(self, recording_id: str) -> Optional[Recording]:
         """Mark recording as paused"""
         ...
     
-    def mark_ended(self, recording_id: str, audio_file_path: str, transcription: str) -> Optional[Recording]:
-        """Mark recording as ended and store transcription"""
-        ...
\ No newline at end of file
+    def mark_ended(self, recording_id: str, audio_file_path: str, transcription: str, llm_provider: Optional[str] = None) -> Optional[Recording]:
+        """Mark recording as ended, store transcription and compact its chunk rows into the manifest"""
+        ...
+    
+    def mark_failed(self, recording_id: str) -> Optional[Recording]:
+        """Mark an abandoned recording failed, e.g. when none of its chunk audio is left"""
+        ...
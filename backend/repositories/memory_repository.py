@@ -0,0 +1,424 @@
+import threading
+import uuid
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from sqlalchemy import inspect
+from models import User, Recording, RecordingChunk, UsageRollup
+from models.recording import RecordingStatus
+from models.types import new_id
+
+
+def _key(value) -> Optional[str]:
+    """Canonical UUID string, or None for malformed IDs (as BinaryUUID binds them)"""
+    try:
+        return str(uuid.UUID(str(value)))
+    except ValueError:
+        return None
+
+
+def _copy(obj):
+    """Detached snapshot of a stored row, so callers never share state across threads"""
+    mapper = inspect(type(obj))
+    return type(obj)(**{attr.key: getattr(obj, attr.key) for attr in mapper.column_attrs})
+
+
+class InMemoryStore:
+    """
+    Tables shared by the in-memory repositories, guarded by one lock.
+
+    Recordings and chunks are also indexed by owner (the user_id and
+    recording_id indexes MySQL has), so per-user and per-recording lookups
+    don't scan the whole store. Add and remove them through put_/pop_ so the
+    indexes stay in step.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.users: Dict[str, User] = {}
+        self.recordings: Dict[str, Recording] = {}
+        self.chunks: Dict[str, RecordingChunk] = {}
+        self.usage: Dict[Tuple[str, date], UsageRollup] = {}
+        self.recordings_by_user: Dict[str, Dict[str, Recording]] = {}
+        self.chunks_by_recording: Dict[str, Dict[int, RecordingChunk]] = {}
+
+    def put_recording(self, recording: Recording) -> None:
+        with self.lock:
+            self.recordings[recording.id] = recording
+            self.recordings_by_user.setdefault(recording.user_id, {})[recording.id] = recording
+
+    def pop_recording(self, recording_id: str) -> Optional[Recording]:
+        with self.lock:
+            recording = self.recordings.pop(recording_id, None)
+            if recording:
+                owned = self.recordings_by_user.get(recording.user_id, {})
+                owned.pop(recording.id, None)
+                if not owned:
+                    self.recordings_by_user.pop(recording.user_id, None)
+                for chunk in list(self.chunks_by_recording.get(recording.id, {}).values()):
+                    self.pop_chunk(chunk.id)
+            return recording
+
+    def put_chunk(self, chunk: RecordingChunk) -> None:
+        with self.lock:
+            self.chunks[chunk.id] = chunk
+            self.chunks_by_recording.setdefault(chunk.recording_id, {})[chunk.chunk_index] = chunk
+
+    def pop_chunk(self, chunk_id: str) -> Optional[RecordingChunk]:
+        with self.lock:
+            chunk = self.chunks.pop(chunk_id, None)
+            if chunk:
+                by_index = self.chunks_by_recording.get(chunk.recording_id, {})
+                by_index.pop(chunk.chunk_index, None)
+                if not by_index:
+                    self.chunks_by_recording.pop(chunk.recording_id, None)
+            return chunk
+
+    def clear(self) -> None:
+        with self.lock:
+            self.users.clear()
+            self.recordings.clear()
+            self.chunks.clear()
+            self.usage.clear()
+            self.recordings_by_user.clear()
+            self.chunks_by_recording.clear()
+
+
+memory_store = InMemoryStore()
+
+
+class InMemoryUserRepository:
+    """In-memory implementation of UserRepository"""
+
+    def __init__(self, store: InMemoryStore = None):
+        self.store = store or memory_store
+
+    def create_user(self, google_id: str, email: str, display_name: str, avatar_url: str) -> User:
+        with self.store.lock:
+            if any(u.google_id == google_id for u in self.store.users.values()):
+                raise ValueError(f"User with google_id {google_id} already exists")
+            now = datetime.utcnow()
+            user = User(
+                id=new_id(),
+                google_id=google_id,
+                email=email,
+                display_name=display_name,
+                avatar_url=avatar_url,
+                created_at=now,
+                updated_at=now
+            )
+            self.store.users[user.id] = user
+            return _copy(user)
+
+    def get_user_by_id(self, user_id: str) -> Optional[User]:
+        with self.store.lock:
+            user = self.store.users.get(_key(user_id))
+            return _copy(user) if user else None
+
+    def get_user_by_google_id(self, google_id: str) -> Optional[User]:
+        with self.store.lock:
+            user = next((u for u in self.store.users.values() if u.google_id == google_id), None)
+            return _copy(user) if user else None
+
+    def update_user(self, user_id: str, **kwargs) -> Optional[User]:
+        with self.store.lock:
+            user = self.store.users.get(_key(user_id))
+            if not user:
+                return None
+            for key, value in kwargs.items():
+                if hasattr(user, key):
+                    setattr(user, key, value)
+            user.updated_at = datetime.utcnow()
+            return _copy(user)
+
+
+class InMemoryRecordingRepository:
+    """In-memory implementation of RecordingRepository"""
+
+    def __init__(self, store: InMemoryStore = None):
+        self.store = store or memory_store
+
+    def _bump(self, recording: Recording, status: Optional[RecordingStatus] = None) -> None:
+        if status is not None:
+            recording.status = status
+        recording.updated_at = datetime.utcnow()
+        recording.version += 1
+
+    def _chunk_rows(self, recording_id: str) -> List[RecordingChunk]:
+        by_index = self.store.chunks_by_recording.get(recording_id, {})
+        return [by_index[index] for index in sorted(by_index)]
+
+    def _user_recordings(self, user_id: str) -> List[Recording]:
+        return list(self.store.recordings_by_user.get(_key(user_id), {}).values())
+
+    def create_recording(self, user_id: str) -> Recording:
+        with self.store.lock:
+            user_id = _key(user_id)
+            if user_id not in self.store.users:
+                raise ValueError(f"User {user_id} not found")
+            now = datetime.utcnow()
+            recording = Recording(
+                id=new_id(),
+                user_id=user_id,
+                status=RecordingStatus.active,
+                llm_provider="requestyai",
+                duration_seconds=0.0,
+                version=1,
+                created_at=now,
+                updated_at=now
+            )
+            self.store.put_recording(recording)
+            return _copy(recording)
+
+    def get_recording(self, recording_id: str) -> Optional[Recording]:
+        with self.store.lock:
+            recording = self.store.recordings.get(_key(recording_id))
+            return _copy(recording) if recording else None
+
+    def get_recording_version(self, recording_id: str) -> Optional[Tuple[str, int]]:
+        with self.store.lock:
+            recording = self.store.recordings.get(_key(recording_id))
+            return (recording.user_id, recording.version) if recording else None
+
+    def get_collection_version(self, user_id: str) -> Tuple[int, int, Optional[datetime]]:
+        with self.store.lock:
+            recordings = self._user_recordings(user_id)
+            return (
+                len(recordings),
+                sum(r.version for r in recordings),
+                max((r.updated_at for r in recordings), default=None)
+            )
+
+    def list_recordings(self, user_id: str) -> List[Recording]:
+        with self.store.lock:
+            recordings = self._user_recordings(user_id)
+            recordings.sort(key=lambda r: r.created_at, reverse=True)
+            return [_copy(r) for r in recordings]
+
+    def iter_recordings(self, user_id: str, start: Optional[date] = None, end: Optional[date] = None, batch_size: int = 100) -> Iterator[Recording]:
+        low = datetime.combine(start, time.min) if start else None
+        high = datetime.combine(end + timedelta(days=1), time.min) if end else None
+        with self.store.lock:
+            recordings = [
+                _copy(r) for r in self._user_recordings(user_id)
+                if (low is None or r.created_at >= low)
+                and (high is None or r.created_at < high)
+            ]
+        recordings.sort(key=lambda r: r.created_at)
+        return iter(recordings)
+
+    def add_chunk(self, recording_id: str, chunk_index: int, chunk_path: str, duration: Optional[float] = None, peaks: Optional[bytes] = None) -> RecordingChunk:
+        with self.store.lock:
+            recording = self.store.recordings.get(_key(recording_id))
+            if not recording:
+                raise ValueError(f"Recording {recording_id} not found")
+            # A retried upload: the chunk is already stored and counted
+            existing = self.get_chunk(recording.id, chunk_index)
+            if existing:
+                return existing
+            uploaded_at = datetime.utcnow()
+            chunk = RecordingChunk(
+                id=new_id(),
+                recording_id=recording.id,
+                chunk_index=chunk_index,
+                audio_blob_path=chunk_path,
+                duration_seconds=duration,
+                peaks=peaks,
+                uploaded_at=uploaded_at
+            )
+            self.store.put_chunk(chunk)
+
+            recording.duration_seconds += duration or 0.0
+            recording.version += 1
+            recording.updated_at = uploaded_at
+            rollup = self.store.usage.get((recording.user_id, uploaded_at.date()))
+            if rollup is None:
+                rollup = self.store.usage[(recording.user_id, uploaded_at.date())] = UsageRollup(
+                    user_id=recording.user_id,
+                    usage_date=uploaded_at.date(),
+                    audio_seconds=0.0,
+                    chunk_count=0
+                )
+            rollup.audio_seconds += duration or 0.0
+            rollup.chunk_count += 1
+            rollup.updated_at = uploaded_at
+
+            if recording.status == RecordingStatus.ended:
+                # A late upload that raced the finish: fold it into the manifest
+                self._compact_chunks(recording)
+            return _copy(chunk)
+
+    def get_usage(self, user_id: str, start: Optional[date] = None, end: Optional[date] = None) -> List[UsageRollup]:
+        with self.store.lock:
+            rollups = [
+                _copy(r) for (owner, usage_date), r in self.store.usage.items()
+                if owner == _key(user_id)
+                and (start is None or usage_date >= start)
+                and (end is None or usage_date <= end)
+            ]
+        return sorted(rollups, key=lambda r: r.usage_date)
+
+    def get_chunks(self, recording_id: str) -> List[RecordingChunk]:
+        with self.store.lock:
+            recording_id = _key(recording_id)
+            chunks = [_copy(c) for c in self._chunk_rows(recording_id)]
+            recording = self.store.recordings.get(recording_id)
+            live = {chunk.chunk_index for chunk in chunks}
+            chunks += [
+                RecordingChunk(recording_id=recording_id, **entry)
+                for entry in (recording.chunk_manifest if recording else None) or []
+                if entry["chunk_index"] not in live
+            ]
+            return sorted(chunks, key=lambda chunk: chunk.chunk_index)
+
+    def get_chunk(self, recording_id: str, chunk_index: int) -> Optional[RecordingChunk]:
+        with self.store.lock:
+            recording_id = _key(recording_id)
+            chunk = self.store.chunks_by_recording.get(recording_id, {}).get(chunk_index)
+            if chunk:
+                return _copy(chunk)
+            recording = self.store.recordings.get(recording_id)
+            manifest = recording.chunk_manifest if recording else None
+            entry = next((e for e in manifest or [] if e["chunk_index"] == chunk_index), None)
+            return RecordingChunk(recording_id=recording_id, **entry) if entry else None
+
+    def _compact_chunks(self, recording: Recording) -> int:
+        chunks = self._chunk_rows(recording.id)
+        if not chunks:
+            return 0
+        entries = {entry["chunk_index"]: entry for entry in recording.chunk_manifest or []}
+        for chunk in chunks:
+            entries[chunk.chunk_index] = {
+                "id": chunk.id,
+                "chunk_index": chunk.chunk_index,
+                "audio_blob_path": chunk.audio_blob_path,
+                "duration_seconds": chunk.duration_seconds,
+                "peaks": chunk.peaks,
+                "uploaded_at": chunk.uploaded_at,
+            }
+            self.store.pop_chunk(chunk.id)
+        recording.chunk_manifest = [entries[index] for index in sorted(entries)]
+        return len(chunks)
+
+    def compact_chunks(self, recording_id: str) -> int:
+        with self.store.lock:
+            recording = self.store.recordings.get(_key(recording_id))
+            if not recording or recording.status != RecordingStatus.ended:
+                return 0
+            return self._compact_chunks(recording)
+
+    def list_uncompacted_recordings(self, limit: int) -> List[str]:
+        with self.store.lock:
+            ids = [
+                recording_id for recording_id in self.store.chunks_by_recording
+                if self.store.recordings.get(recording_id) is not None
+                and self.store.recordings[recording_id].status == RecordingStatus.ended
+            ]
+            return ids[:limit]
+
+    def refresh_recording(self, recording_id: str) -> Optional[Recording]:
+        # There is no transaction snapshot to leave; every read is current
+        return self.get_recording(recording_id)
+
+    def release_connection(self) -> None:
+        pass
+
+    def renew_finish(self, recording_id: str) -> bool:
+        with self.store.lock:
+            recording = self.store.recordings.get(_key(recording_id))
+            if not recording or recording.status != RecordingStatus.finishing:
+                return False
+            recording.updated_at = datetime.utcnow()
+            recording.version += 1
+            return True
+
+    def claim_finish(self, recording_id: str, stale_before: datetime) -> Optional[RecordingStatus]:
+        with self.store.lock:
+            recording = self.store.recordings.get(_key(recording_id))
+            if not recording:
+                return None
+            previous = recording.status
+            claimable = previous in (RecordingStatus.active, RecordingStatus.paused) or (
+                previous == RecordingStatus.finishing and recording.updated_at < stale_before
+            )
+            if not claimable:
+                return None
+            self._bump(recording, RecordingStatus.finishing)
+            return previous
+
+    def release_finish(self, recording_id: str, status: RecordingStatus) -> None:
+        with self.store.lock:
+            recording = self.store.recordings.get(_key(recording_id))
+            if recording and recording.status == RecordingStatus.finishing:
+                self._bump(recording, status)
+
+    def list_stale_recordings(self, idle_before: datetime, lease_before: datetime, limit: int) -> List[Recording]:
+        with self.store.lock:
+            stale = [
+                r for r in self.store.recordings.values()
+                if (r.status in (RecordingStatus.active, RecordingStatus.paused) and r.updated_at < idle_before)
+                or (r.status == RecordingStatus.finishing and r.updated_at < lease_before)
+            ]
+            stale.sort(key=lambda r: r.updated_at)
+            return [_copy(r) for r in stale[:limit]]
+
+    def delete_recording(self, recording_id: str) -> bool:
+        with self.store.lock:
+            return self.store.pop_recording(_key(recording_id)) is not None
+
+    def existing_recording_ids(self, recording_ids: Iterable[str]) -> Set[str]:
+        with self.store.lock:
+            return {_key(i) for i in recording_ids if _key(i) in self.store.recordings}
+
+    def iter_chunk_files(self, batch_size: int = 500) -> Iterator[Tuple[str, str]]:
+        with self.store.lock:
+            return iter([
+                (c.id, c.audio_blob_path) for c in self.store.chunks.values()
+                if self.store.recordings[c.recording_id].status != RecordingStatus.ended
+            ])
+
+    def delete_chunks(self, chunk_ids: List[str]) -> int:
+        with self.store.lock:
+            return sum(1 for i in chunk_ids if self.store.pop_chunk(_key(i)) is not None)
+
+    def iter_audio_files(self, batch_size: int = 500) -> Iterator[Tuple[str, str]]:
+        with self.store.lock:
+            return iter([
+                (r.id, r.audio_file_path) for r in self.store.recordings.values()
+                if r.audio_file_path is not None
+            ])
+
+    def clear_audio_file(self, recording_id: str) -> None:
+        with self.store.lock:
+            recording = self.store.recordings.get(_key(recording_id))
+            if recording:
+                recording.audio_file_path = None
+                self._bump(recording)
+
+    def mark_paused(self, recording_id: str) -> Optional[Recording]:
+        with self.store.lock:
+            recording = self.store.recordings.get(_key(recording_id))
+            if not recording:
+                return None
+            self._bump(recording, RecordingStatus.paused)
+            return _copy(recording)
+
+    def mark_ended(self, recording_id: str, audio_file_path: str, transcription: str, llm_provider: Optional[str] = None) -> Optional[Recording]:
+        with self.store.lock:
+            recording = self.store.recordings.get(_key(recording_id))
+            if not recording:
+                return None
+            recording.audio_file_path = audio_file_path
+            recording.transcription_text = transcription
+            if llm_provider:
+                recording.llm_provider = llm_provider
+            self._compact_chunks(recording)
+            self._bump(recording, RecordingStatus.ended)
+            return _copy(recording)
+
+    def mark_failed(self, recording_id: str) -> Optional[Recording]:
+        with self.store.lock:
+            recording = self.store.recordings.get(_key(recording_id))
+            if not recording:
+                return None
+            self._bump(recording, RecordingStatus.failed)
+            return _copy(recording)
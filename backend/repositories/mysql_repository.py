@@ -1,8 +1,13 @@
-from typing import List, Optional
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+from sqlalchemy import and_, func, or_, update
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from models import User, Recording, RecordingChunk
+from database import SessionLocal, read_only, writes
+from models import User, Recording, RecordingChunk, UsageRollup
 from models.recording import RecordingStatus
-from datetime import datetime
+from datetime import date, datetime, time, timedelta
 
 
 class MySQLUserRepository:
@@ -11,6 +16,7 @@ class MySQLUserRepository:
     def __init__(self, db: Session):
         self.db = db
     
+    @writes
     def create_user(self, google_id: str, email: str, display_name: str, avatar_url: str) -> User:
         user = User(
             google_id=google_id,
@@ -23,12 +29,15 @@ class MySQLUserRepository:
         self.db.refresh(user)
         return user
     
+    @read_only
     def get_user_by_id(self, user_id: str) -> Optional[User]:
         return self.db.query(User).filter(User.id == user_id).first()
     
+    @read_only
     def get_user_by_google_id(self, google_id: str) -> Optional[User]:
         return self.db.query(User).filter(User.google_id == google_id).first()
     
+    @writes
     def update_user(self, user_id: str, **kwargs) -> Optional[User]:
         user = self.get_user_by_id(user_id)
         if user:
@@ -47,6 +56,7 @@ class MySQLRecordingRepository:
     def __init__(self, db: Session):
         self.db = db
     
+    @writes
     def create_recording(self, user_id: str) -> Recording:
         recording = Recording(user_id=user_id)
         self.db.add(recording)
@@ -54,45 +64,386 @@ class MySQLRecordingRepository:
         self.db.refresh(recording)
         return recording
     
+    @read_only
     def get_recording(self, recording_id: str) -> Optional[Recording]:
         return self.db.query(Recording).filter(Recording.id == recording_id).first()
     
+    @read_only
+    def get_recording_version(self, recording_id: str) -> Optional[Tuple[str, int]]:
+        return self.db.query(Recording.user_id, Recording.version).filter(Recording.id == recording_id).first()
+    
+    @read_only
+    def get_collection_version(self, user_id: str) -> Tuple[int, int, Optional[datetime]]:
+        return self.db.query(
+            func.count(Recording.id),
+            func.coalesce(func.sum(Recording.version), 0),
+            func.max(Recording.updated_at)
+        ).filter(Recording.user_id == user_id).one()
+    
+    @read_only
     def list_recordings(self, user_id: str) -> List[Recording]:
         return self.db.query(Recording).filter(Recording.user_id == user_id).order_by(Recording.created_at.desc()).all()
     
-    def add_chunk(self, recording_id: str, chunk_index: int, chunk_path: str, duration: Optional[float] = None) -> RecordingChunk:
+    @read_only
+    def iter_recordings(self, user_id: str, start: Optional[date] = None, end: Optional[date] = None, batch_size: int = 100) -> Iterator[Recording]:
+        query = self.db.query(Recording).filter(Recording.user_id == user_id)
+        if start:
+            query = query.filter(Recording.created_at >= datetime.combine(start, time.min))
+        if end:
+            query = query.filter(Recording.created_at < datetime.combine(end + timedelta(days=1), time.min))
+        return iter(query.order_by(Recording.created_at).yield_per(batch_size))
+    
+    @writes
+    def add_chunk(self, recording_id: str, chunk_index: int, chunk_path: str, duration: Optional[float] = None, peaks: Optional[bytes] = None) -> RecordingChunk:
+        # A retried upload: the chunk is already stored and counted
+        existing = self.get_chunk(recording_id, chunk_index)
+        if existing:
+            return existing
+        
+        uploaded_at = datetime.utcnow()
         chunk = RecordingChunk(
             recording_id=recording_id,
             chunk_index=chunk_index,
             audio_blob_path=chunk_path,
-            duration_seconds=duration
+            duration_seconds=duration,
+            peaks=peaks,
+            uploaded_at=uploaded_at
         )
         self.db.add(chunk)
+        try:
+            self.db.flush()
+        except IntegrityError:
+            # A concurrent retry inserted it first
+            self.db.rollback()
+            return self.get_chunk(recording_id, chunk_index)
+        status = self._record_usage(recording_id, duration or 0.0, uploaded_at)
+        if status == RecordingStatus.ended:
+            # A late upload that raced the finish: fold it into the manifest
+            self._compact_chunks(recording_id)
+            self.db.commit()
+            return chunk
         self.db.commit()
         self.db.refresh(chunk)
         return chunk
     
+    def _record_usage(self, recording_id: str, duration: float, uploaded_at: datetime) -> Optional[RecordingStatus]:
+        """
+        Add a chunk's duration to the recording total and the daily rollup, in the caller's transaction
+        
+        Returns:
+            The recording's status
+        """
+        self.db.execute(
+            update(Recording)
+            .where(Recording.id == recording_id)
+            .values(
+                duration_seconds=Recording.duration_seconds + duration,
+                version=Recording.version + 1
+            )
+        )
+        
+        user_id, status = self.db.query(Recording.user_id, Recording.status).filter(Recording.id == recording_id).one()
+        values = dict(
+            user_id=user_id,
+            usage_date=uploaded_at.date(),
+            audio_seconds=duration,
+            chunk_count=1,
+            updated_at=uploaded_at
+        )
+        increments = dict(
+            audio_seconds=UsageRollup.audio_seconds + duration,
+            chunk_count=UsageRollup.chunk_count + 1,
+            updated_at=uploaded_at
+        )
+        if self.db.get_bind().dialect.name == "sqlite":
+            stmt = sqlite.insert(UsageRollup).values(**values).on_conflict_do_update(
+                index_elements=[UsageRollup.user_id, UsageRollup.usage_date],
+                set_=increments
+            )
+        else:
+            stmt = mysql.insert(UsageRollup).values(**values).on_duplicate_key_update(**increments)
+        self.db.execute(stmt)
+        return status
+    
+    @read_only
+    def get_usage(self, user_id: str, start: Optional[date] = None, end: Optional[date] = None) -> List[UsageRollup]:
+        query = self.db.query(UsageRollup).filter(UsageRollup.user_id == user_id)
+        if start:
+            query = query.filter(UsageRollup.usage_date >= start)
+        if end:
+            query = query.filter(UsageRollup.usage_date <= end)
+        return query.order_by(UsageRollup.usage_date).all()
+    
+    @read_only
     def get_chunks(self, recording_id: str) -> List[RecordingChunk]:
-        return self.db.query(RecordingChunk).filter(
+        chunks = self.db.query(RecordingChunk).filter(
             RecordingChunk.recording_id == recording_id
         ).order_by(RecordingChunk.chunk_index).all()
+        manifest = self.db.query(Recording.chunk_manifest).filter(Recording.id == recording_id).scalar()
+        if not manifest:
+            return chunks
+        
+        # Ended recordings keep their chunks in the manifest, and late uploads may
+        # still be rows awaiting compaction; rows win, as they do when compacted
+        live = {chunk.chunk_index for chunk in chunks}
+        chunks += [
+            RecordingChunk(recording_id=recording_id, **entry)
+            for entry in manifest if entry["chunk_index"] not in live
+        ]
+        return sorted(chunks, key=lambda chunk: chunk.chunk_index)
+    
+    @read_only
+    def get_chunk(self, recording_id: str, chunk_index: int) -> Optional[RecordingChunk]:
+        chunk = self.db.query(RecordingChunk).filter(
+            RecordingChunk.recording_id == recording_id,
+            RecordingChunk.chunk_index == chunk_index
+        ).first()
+        if chunk:
+            return chunk
+        manifest = self.db.query(Recording.chunk_manifest).filter(Recording.id == recording_id).scalar()
+        entry = next((e for e in manifest or [] if e["chunk_index"] == chunk_index), None)
+        return RecordingChunk(recording_id=recording_id, **entry) if entry else None
     
+    def _compact_chunks(self, recording_id: str) -> int:
+        """Move a recording's chunk rows into its manifest, in the caller's transaction"""
+        chunks = self.db.query(RecordingChunk).filter(RecordingChunk.recording_id == recording_id).all()
+        if not chunks:
+            return 0
+        
+        recording = self.db.query(Recording).filter(Recording.id == recording_id).first()
+        entries = {entry["chunk_index"]: entry for entry in recording.chunk_manifest or []}
+        for chunk in chunks:
+            entries[chunk.chunk_index] = {
+                "id": chunk.id,
+                "chunk_index": chunk.chunk_index,
+                "audio_blob_path": chunk.audio_blob_path,
+                "duration_seconds": chunk.duration_seconds,
+                "peaks": chunk.peaks,
+                "uploaded_at": chunk.uploaded_at,
+            }
+        recording.chunk_manifest = [entries[index] for index in sorted(entries)]
+        self.db.query(RecordingChunk).filter(
+            RecordingChunk.id.in_([chunk.id for chunk in chunks])
+        ).delete(synchronize_session=False)
+        for chunk in chunks:
+            self.db.expunge(chunk)
+        return len(chunks)
+    
+    @writes
+    def compact_chunks(self, recording_id: str) -> int:
+        """Compact an ended recording's chunk rows into its manifest"""
+        status = self.db.query(Recording.status).filter(Recording.id == recording_id).scalar()
+        if status != RecordingStatus.ended:
+            self.db.commit()
+            return 0
+        compacted = self._compact_chunks(recording_id)
+        self.db.commit()
+        return compacted
+    
+    @read_only
+    def list_uncompacted_recordings(self, limit: int) -> List[str]:
+        """IDs of ended recordings that still have chunk rows"""
+        rows = self.db.query(RecordingChunk.recording_id).join(Recording).filter(
+            Recording.status == RecordingStatus.ended
+        ).distinct().limit(limit)
+        return [row[0] for row in rows]
+    
+    @contextmanager
+    def _primary_session(self):
+        """Short-lived primary session, independent of the caller's transaction and thread"""
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+    
+    def refresh_recording(self, recording_id: str) -> Optional[Recording]:
+        """
+        Re-read a recording outside the current transaction snapshot.
+        
+        The read runs in its own session, so the caller's transaction is
+        neither committed nor extended; the fresh row replaces the caller's
+        copy without another query.
+        """
+        with self._primary_session() as db:
+            recording = db.query(Recording).filter(Recording.id == recording_id).first()
+            if recording is None:
+                return None
+            db.expunge(recording)
+        return self.db.merge(recording, load=False)
+    
+    def release_connection(self) -> None:
+        """End the session's read transaction so its connection goes back to the pool"""
+        if self.db.new or self.db.dirty or self.db.deleted or self.db.info.get("wrote"):
+            raise RuntimeError("Commit pending changes before releasing the connection")
+        self.db.rollback()
+    
+    def renew_finish(self, recording_id: str) -> bool:
+        """Extend the finishing lease; runs in its own session so a heartbeat thread can call it"""
+        with self._primary_session() as db:
+            result = db.execute(
+                update(Recording)
+                .where(Recording.id == recording_id, Recording.status == RecordingStatus.finishing)
+                .values(updated_at=datetime.utcnow(), version=Recording.version + 1)
+            )
+            db.commit()
+            return result.rowcount == 1
+    
+    @writes
+    def claim_finish(self, recording_id: str, stale_before: datetime) -> Optional[RecordingStatus]:
+        """
+        Compare-and-set the recording into the finishing state.
+        
+        A recording is claimable while active or paused, or while finishing
+        under a lease that was last renewed before `stale_before`.
+        
+        Returns:
+            The status the recording had before the claim, or None if another
+            finisher holds it (or it does not exist)
+        """
+        row = self.db.query(Recording.status, Recording.updated_at).filter(
+            Recording.id == recording_id
+        ).first()
+        if not row:
+            return None
+        
+        previous, updated_at = row
+        claimable = previous in (RecordingStatus.active, RecordingStatus.paused) or (
+            previous == RecordingStatus.finishing and updated_at < stale_before
+        )
+        if not claimable:
+            self.db.commit()
+            return None
+        
+        result = self.db.execute(
+            update(Recording)
+            .where(
+                Recording.id == recording_id,
+                Recording.status == previous,
+                Recording.updated_at == updated_at
+            )
+            .values(
+                status=RecordingStatus.finishing,
+                updated_at=datetime.utcnow(),
+                version=Recording.version + 1
+            )
+        )
+        if result.rowcount != 1:
+            self.db.rollback()
+            return None
+        
+        self.db.commit()
+        return previous
+    
+    @writes
+    def release_finish(self, recording_id: str, status: RecordingStatus) -> None:
+        """Return a recording from finishing to `status` after a failed finish"""
+        self.db.execute(
+            update(Recording)
+            .where(Recording.id == recording_id, Recording.status == RecordingStatus.finishing)
+            .values(status=status, updated_at=datetime.utcnow(), version=Recording.version + 1)
+        )
+        self.db.commit()
+    
+    @read_only
+    def list_stale_recordings(self, idle_before: datetime, lease_before: datetime, limit: int) -> List[Recording]:
+        """Unfinished recordings idle since `idle_before`, plus finishing ones whose lease expired"""
+        return self.db.query(Recording).filter(
+            or_(
+                and_(
+                    Recording.status.in_([RecordingStatus.active, RecordingStatus.paused]),
+                    Recording.updated_at < idle_before
+                ),
+                and_(
+                    Recording.status == RecordingStatus.finishing,
+                    Recording.updated_at < lease_before
+                )
+            )
+        ).order_by(Recording.updated_at).limit(limit).all()
+    
+    @writes
+    def delete_recording(self, recording_id: str) -> bool:
+        recording = self.get_recording(recording_id)
+        if not recording:
+            return False
+        self.db.delete(recording)
+        self.db.commit()
+        return True
+    
+    def existing_recording_ids(self, recording_ids: Iterable[str]) -> Set[str]:
+        ids = list(recording_ids)
+        if not ids:
+            return set()
+        return {row[0] for row in self.db.query(Recording.id).filter(Recording.id.in_(ids))}
+    
+    @read_only
+    def iter_chunk_files(self, batch_size: int = 500) -> Iterator[Tuple[str, str]]:
+        """Iterate (chunk_id, audio_blob_path) for chunk rows of recordings that have not ended"""
+        query = self.db.query(RecordingChunk.id, RecordingChunk.audio_blob_path).join(
+            Recording, Recording.id == RecordingChunk.recording_id
+        ).filter(Recording.status != RecordingStatus.ended)
+        return iter(query.yield_per(batch_size))
+    
+    @writes
+    def delete_chunks(self, chunk_ids: List[str]) -> int:
+        if not chunk_ids:
+            return 0
+        deleted = self.db.query(RecordingChunk).filter(
+            RecordingChunk.id.in_(chunk_ids)
+        ).delete(synchronize_session=False)
+        self.db.commit()
+        return deleted
+    
+    @read_only
+    def iter_audio_files(self, batch_size: int = 500) -> Iterator[Tuple[str, str]]:
+        """Iterate (recording_id, audio_file_path) for recordings with assembled audio"""
+        query = self.db.query(Recording.id, Recording.audio_file_path).filter(
+            Recording.audio_file_path.isnot(None)
+        )
+        return iter(query.yield_per(batch_size))
+    
+    @writes
+    def clear_audio_file(self, recording_id: str) -> None:
+        recording = self.get_recording(recording_id)
+        if recording:
+            recording.audio_file_path = None
+            recording.version = Recording.version + 1
+            self.db.commit()
+    
+    @writes
     def mark_paused(self, recording_id: str) -> Optional[Recording]:
         recording = self.get_recording(recording_id)
         if recording:
             recording.status = RecordingStatus.paused
             recording.updated_at = datetime.utcnow()
+            recording.version = Recording.version + 1
             self.db.commit()
             self.db.refresh(recording)
         return recording
     
-    def mark_ended(self, recording_id: str, audio_file_path: str, transcription: str) -> Optional[Recording]:
+    @writes
+    def mark_ended(self, recording_id: str, audio_file_path: str, transcription: str, llm_provider: Optional[str] = None) -> Optional[Recording]:
         recording = self.get_recording(recording_id)
         if recording:
             recording.status = RecordingStatus.ended
             recording.audio_file_path = audio_file_path
             recording.transcription_text = transcription
+            if llm_provider:
+                recording.llm_provider = llm_provider
+            self._compact_chunks(recording_id)
+            recording.updated_at = datetime.utcnow()
+            recording.version = Recording.version + 1
+            self.db.commit()
+            self.db.refresh(recording)
+        return recording
+    
+    @writes
+    def mark_failed(self, recording_id: str) -> Optional[Recording]:
+        recording = self.get_recording(recording_id)
+        if recording:
+            recording.status = RecordingStatus.failed
             recording.updated_at = datetime.utcnow()
+            recording.version = Recording.version + 1
             self.db.commit()
             self.db.refresh(recording)
-        return recording
\ No newline at end of file
+        return recording
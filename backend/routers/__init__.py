@@ -1,4 +1,6 @@
 from .auth import router as auth_router
 from .recordings import router as recordings_router
+from .usage import router as usage_router
+from .admin import router as admin_router
 
-__all__ = ["auth_router", "recordings_router"]
\ No newline at end of file
+__all__ = ["auth_router", "recordings_router", "usage_router", "admin_router"]
\ No newline at end of file
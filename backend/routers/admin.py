@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from typing import List, Optional
+from middleware.profiling import profile_store, token_authorized
+from pydantic import BaseModel
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+class ProfileSummary(BaseModel):
+    id: str
+    method: str
+    path: str
+    status_code: Optional[int] = None
+    started_at: str
+    duration_ms: float
+    samples: int
+    sql_count: int
+    sql_ms: float
+
+
+class SqlStatement(BaseModel):
+    statement: str
+    count: int
+    total_ms: float
+
+
+class ProfileDetail(ProfileSummary):
+    sql_statements: List[SqlStatement]
+
+
+def require_profiling_token(x_profile_token: Optional[str] = Header(None)):
+    """Dependency: only callers presenting PROFILING_TOKEN may read profiles"""
+    if not token_authorized(x_profile_token):
+        # Don't advertise the endpoint when profiling access isn't configured
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not found"
+        )
+
+
+def get_profile_or_404(profile_id: str):
+    profile = profile_store.get(profile_id)
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    return profile
+
+
+@router.get("/profiles", response_model=List[ProfileSummary], dependencies=[Depends(require_profiling_token)])
+async def list_profiles():
+    """List captured request profiles, newest first"""
+    return [profile.summary() for profile in profile_store.list()]
+
+
+@router.get("/profiles/{profile_id}", response_model=ProfileDetail, dependencies=[Depends(require_profiling_token)])
+async def get_profile(profile_id: str):
+    """Get one profile's timings and its slowest SQL statements"""
+    return get_profile_or_404(profile_id).detail()
+
+
+@router.get("/profiles/{profile_id}/folded", dependencies=[Depends(require_profiling_token)])
+async def download_folded_stacks(profile_id: str):
+    """Download stack samples in collapsed format for flamegraph.pl, speedscope or inferno"""
+    profile = get_profile_or_404(profile_id)
+    return PlainTextResponse(
+        profile.folded(),
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile.id}.folded"'}
+    )
@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
+from typing import Optional
 from authlib.integrations.starlette_client import OAuth
 from starlette.requests import Request
 from config import settings
-from database import get_db
-from repositories.mysql_repository import MySQLUserRepository
+from repositories.interfaces import UserRepository
+from repositories.dependencies import get_repository_session, get_user_repository
 from services.auth_service import AuthService
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
@@ -37,7 +38,7 @@ async def google_login(request: Request):
 
 
 @router.get("/google/callback")
-async def google_callback(request: Request, db: Session = Depends(get_db)):
+async def google_callback(request: Request, user_repo: UserRepository = Depends(get_user_repository)):
     """Handle Google OAuth2 callback"""
     try:
         # Get access token from Google
@@ -64,7 +65,6 @@ async def google_callback(request: Request, db: Session = Depends(get_db)):
             )
         
         # Create or get user
-        user_repo = MySQLUserRepository(db)
         auth_service = AuthService(user_repo)
         user = auth_service.get_or_create_user(google_id, email, name, picture)
         
@@ -83,7 +83,11 @@ async def google_callback(request: Request, db: Session = Depends(get_db)):
 
 
 @router.get("/verify")
-async def verify_token(request: Request, db: Session = Depends(get_db)):
+async def verify_token(
+    request: Request,
+    user_repo: UserRepository = Depends(get_user_repository),
+    db: Optional[Session] = Depends(get_repository_session)
+):
     """Verify JWT token and return user info"""
     auth_header = request.headers.get('Authorization')
     if not auth_header or not auth_header.startswith('Bearer '):
@@ -94,7 +98,6 @@ async def verify_token(request: Request, db: Session = Depends(get_db)):
     
     token = auth_header.split(' ')[1]
     
-    user_repo = MySQLUserRepository(db)
     auth_service = AuthService(user_repo)
     
     user_id = auth_service.verify_token(token)
@@ -104,6 +107,10 @@ async def verify_token(request: Request, db: Session = Depends(get_db)):
             detail="Invalid or expired token"
         )
     
+    # Keep this user's reads on the primary shortly after their own writes
+    if db is not None:
+        db.info["sticky_key"] = user_id
+    
     user = user_repo.get_user_by_id(user_id)
     if not user:
         raise HTTPException(
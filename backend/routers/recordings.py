@@ -1,14 +1,24 @@
 import os
+import uuid
+from datetime import date
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from starlette.requests import Request
 from config import settings
-from database import get_db
-from repositories.mysql_repository import MySQLUserRepository, MySQLRecordingRepository
+from repositories.interfaces import UserRepository, RecordingRepository
+from repositories.dependencies import (
+    get_repository_session, get_user_repository, get_recording_repository, open_recording_repository
+)
+from models.recording import RecordingStatus
 from services.auth_service import AuthService
-from services.recording_service import RecordingService
-from llm.requestyai_provider import RequestYaiProvider
+from services.recording_service import RecordingService, FinishInProgressError
+from services.waveform_service import WaveformService, EBML_MAGIC
+from services.export_service import ExportService
+from services.webm_parser import parse_webm_duration
+from llm.routing import get_provider_router
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/recordings", tags=["recordings"])
@@ -21,6 +31,7 @@ class RecordingResponse(BaseModel):
     status: str
     audio_file_path: str | None
     transcription_text: str | None
+    duration_seconds: float
     created_at: str
     updated_at: str
 
@@ -28,8 +39,45 @@ class RecordingResponse(BaseModel):
         from_attributes = True
 
 
+class PeaksResponse(BaseModel):
+    recording_id: str
+    peaks_per_second: float
+    length: int
+    peaks: List[int]
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison of an ETag against the request's If-None-Match header"""
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag.removeprefix("W/") for tag in candidates)
+
+
+def not_modified(etag: str) -> Response:
+    # Carries the Vary of the JSON response it stands in for
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Accept-Encoding"}
+    )
+
+
+def chunk_uploaded(chunk) -> dict:
+    return {
+        "message": "Chunk uploaded successfully",
+        "chunk_id": chunk.id,
+        "chunk_index": chunk.chunk_index,
+        "duration_seconds": chunk.duration_seconds
+    }
+
+
 # Dependency to get current user from JWT token
-async def get_current_user(request: Request, db: Session = Depends(get_db)):
+async def get_current_user(
+    request: Request,
+    user_repo: UserRepository = Depends(get_user_repository),
+    db: Optional[Session] = Depends(get_repository_session)
+):
     """Extract and verify user from JWT token"""
     auth_header = request.headers.get('Authorization')
     if not auth_header or not auth_header.startswith('Bearer '):
@@ -40,7 +88,6 @@ async def get_current_user(request: Request, db: Session = Depends(get_db)):
     
     token = auth_header.split(' ')[1]
     
-    user_repo = MySQLUserRepository(db)
     auth_service = AuthService(user_repo)
     
     user_id = auth_service.verify_token(token)
@@ -50,6 +97,10 @@ async def get_current_user(request: Request, db: Session = Depends(get_db)):
             detail="Invalid or expired token"
         )
     
+    # Keep this user's reads on the primary shortly after their own writes
+    if db is not None:
+        db.info["sticky_key"] = user_id
+    
     user = user_repo.get_user_by_id(user_id)
     if not user:
         raise HTTPException(
@@ -62,11 +113,20 @@ async def get_current_user(request: Request, db: Session = Depends(get_db)):
 
 @router.get("", response_model=List[RecordingResponse])
 async def list_recordings(
+    request: Request,
+    response: Response,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    recording_repo: RecordingRepository = Depends(get_recording_repository)
 ):
     """List all recordings for the current user"""
-    recording_repo = MySQLRecordingRepository(db)
+    # One aggregate over the user's recordings; a 304 loads and serializes no rows
+    count, versions, latest = recording_repo.get_collection_version(current_user.id)
+    etag = f'W/"{current_user.id}-{count}-{versions}-{latest.isoformat() if latest else ""}"'
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    
     recordings = recording_repo.list_recordings(current_user.id)
     
     return [
@@ -76,6 +136,7 @@ async def list_recordings(
             status=r.status.value,
             audio_file_path=r.audio_file_path,
             transcription_text=r.transcription_text,
+            duration_seconds=r.duration_seconds or 0.0,
             created_at=r.created_at.isoformat(),
             updated_at=r.updated_at.isoformat()
         )
@@ -83,13 +144,46 @@ async def list_recordings(
     ]
 
 
+@router.get("/export")
+async def export_recordings(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    format: str = "zip",
+    current_user = Depends(get_current_user)
+):
+    """Stream a ZIP or tar archive of the current user's recordings and transcripts"""
+    if format not in ExportService.FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported export format: {format}"
+        )
+    
+    user_id = current_user.id
+    export_service = ExportService()
+    
+    def archive():
+        # The stream outlives the request-scoped session, so it owns its own
+        recording_repo, close = open_recording_repository()
+        try:
+            recordings = recording_repo.iter_recordings(user_id, start, end, settings.EXPORT_BATCH_SIZE)
+            yield from export_service.stream(recordings, format)
+        finally:
+            close()
+    
+    media_type = "application/zip" if format == "zip" else "application/x-tar"
+    return StreamingResponse(
+        archive(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="recordings-export.{format}"'}
+    )
+
+
 @router.post("", response_model=RecordingResponse)
 async def create_recording(
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    recording_repo: RecordingRepository = Depends(get_recording_repository)
 ):
     """Create a new recording session"""
-    recording_repo = MySQLRecordingRepository(db)
     recording = recording_repo.create_recording(current_user.id)
     
     return RecordingResponse(
@@ -98,6 +192,7 @@ async def create_recording(
         status=recording.status.value,
         audio_file_path=recording.audio_file_path,
         transcription_text=recording.transcription_text,
+        duration_seconds=recording.duration_seconds or 0.0,
         created_at=recording.created_at.isoformat(),
         updated_at=recording.updated_at.isoformat()
     )
@@ -109,11 +204,9 @@ async def upload_chunk(
     chunk_index: int = Form(...),
     audio_chunk: UploadFile = File(...),
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    recording_repo: RecordingRepository = Depends(get_recording_repository)
 ):
     """Upload an audio chunk for a recording"""
-    recording_repo = MySQLRecordingRepository(db)
-    
     # Verify recording exists and belongs to user
     recording = recording_repo.get_recording(recording_id)
     if not recording:
@@ -128,37 +221,64 @@ async def upload_chunk(
             detail="Not authorized to upload to this recording"
         )
     
+    # Reject late chunks before touching disk
+    if recording.status in (RecordingStatus.finishing, RecordingStatus.ended, RecordingStatus.failed):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Recording is {recording.status.value}; no more chunks accepted"
+        )
+    
+    # A retried upload: the stored chunk already holds this index's audio and billing
+    existing = recording_repo.get_chunk(recording.id, chunk_index)
+    if existing:
+        return chunk_uploaded(existing)
+    
     # Create chunks directory
-    chunks_dir = os.path.join(settings.AUDIO_STORAGE_PATH, "chunks", recording_id)
+    # Use the canonical ID so storage paths match what maintenance sees in the database
+    chunks_dir = os.path.join(settings.AUDIO_STORAGE_PATH, "chunks", recording.id)
     os.makedirs(chunks_dir, exist_ok=True)
     
-    # Save chunk file
-    chunk_filename = f"chunk_{chunk_index}_{audio_chunk.filename}"
+    # Save chunk file; the name is unique per upload so a concurrent retry of the
+    # same index never overwrites the audio that ends up recorded
+    chunk_filename = f"chunk_{chunk_index}_{uuid.uuid4().hex[:8]}_{os.path.basename(audio_chunk.filename or 'chunk.webm')}"
     chunk_path = os.path.join(chunks_dir, chunk_filename)
     
     with open(chunk_path, "wb") as f:
         content = await audio_chunk.read()
         f.write(content)
     
+    # Headerless chunks need the init segment of chunk 0 to be decoded
+    first_chunk = None
+    if not content.startswith(EBML_MAGIC):
+        first_chunk = recording_repo.get_chunk(recording.id, 0)
+    
+    def analyze():
+        init_segment = b""
+        if first_chunk and os.path.exists(first_chunk.audio_blob_path):
+            with open(first_chunk.audio_blob_path, "rb") as f:
+                init_segment = WaveformService.init_segment(f.read())
+        peaks = WaveformService().compute_chunk_peaks(content, init_segment)
+        return peaks, parse_webm_duration(init_segment + content)
+    
+    # ffmpeg decoding takes up to seconds; keep it off the event loop
+    peaks, duration = await run_in_threadpool(analyze)
+    
     # Add chunk to database
-    chunk = recording_repo.add_chunk(recording_id, chunk_index, chunk_path)
+    chunk = recording_repo.add_chunk(recording_id, chunk_index, chunk_path, duration=duration, peaks=peaks)
+    if chunk.audio_blob_path != chunk_path:
+        # A concurrent upload of the same index was stored first
+        os.remove(chunk_path)
     
-    return {
-        "message": "Chunk uploaded successfully",
-        "chunk_id": chunk.id,
-        "chunk_index": chunk.chunk_index
-    }
+    return chunk_uploaded(chunk)
 
 
 @router.patch("/{recording_id}/pause")
 async def pause_recording(
     recording_id: str,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    recording_repo: RecordingRepository = Depends(get_recording_repository)
 ):
     """Mark a recording as paused"""
-    recording_repo = MySQLRecordingRepository(db)
-    
     # Verify recording exists and belongs to user
     recording = recording_repo.get_recording(recording_id)
     if not recording:
@@ -173,6 +293,12 @@ async def pause_recording(
             detail="Not authorized to modify this recording"
         )
     
+    if recording.status in (RecordingStatus.finishing, RecordingStatus.ended, RecordingStatus.failed):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Recording is {recording.status.value} and cannot be paused"
+        )
+    
     recording = recording_repo.mark_paused(recording_id)
     
     return {
@@ -185,11 +311,9 @@ async def pause_recording(
 async def finish_recording(
     recording_id: str,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    recording_repo: RecordingRepository = Depends(get_recording_repository)
 ):
     """Finish a recording, assemble chunks, and trigger transcription"""
-    recording_repo = MySQLRecordingRepository(db)
-    
     # Verify recording exists and belongs to user
     recording = recording_repo.get_recording(recording_id)
     if not recording:
@@ -204,12 +328,23 @@ async def finish_recording(
             detail="Not authorized to modify this recording"
         )
     
+    if recording.status == RecordingStatus.failed:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Recording failed: none of its audio is left to transcribe"
+        )
+    
     # Assemble chunks and transcribe
-    llm_provider = RequestYaiProvider()
-    recording_service = RecordingService(recording_repo, llm_provider)
+    recording_service = RecordingService(recording_repo, get_provider_router())
     
     try:
-        recording = recording_service.finish_recording(recording_id)
+        recording = await recording_service.finish_or_wait(recording.id)
+    except FinishInProgressError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e),
+            headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)}
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -222,19 +357,20 @@ async def finish_recording(
         status=recording.status.value,
         audio_file_path=recording.audio_file_path,
         transcription_text=recording.transcription_text,
+        duration_seconds=recording.duration_seconds or 0.0,
         created_at=recording.created_at.isoformat(),
         updated_at=recording.updated_at.isoformat()
     )
 
 
-@router.get("/{recording_id}", response_model=RecordingResponse)
-async def get_recording(
+@router.get("/{recording_id}/peaks", response_model=PeaksResponse)
+async def get_recording_peaks(
     recording_id: str,
+    max_peaks: int = 2000,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    recording_repo: RecordingRepository = Depends(get_recording_repository)
 ):
-    """Get a specific recording by ID"""
-    recording_repo = MySQLRecordingRepository(db)
+    """Get merged waveform peaks for a recording, downsampled to at most max_peaks pairs"""
     recording = recording_repo.get_recording(recording_id)
     
     if not recording:
@@ -249,12 +385,75 @@ async def get_recording(
             detail="Not authorized to view this recording"
         )
     
+    if max_peaks < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="max_peaks must be positive"
+        )
+    
+    waveform_service = WaveformService()
+    chunks = recording_repo.get_chunks(recording_id)
+    total = sum(len(c.peaks) // 2 for c in chunks if c.peaks)
+    peaks = waveform_service.merge_peaks([c.peaks for c in chunks], max_peaks)
+    
+    # Each returned pair covers total / len(peaks) base-resolution pairs
+    peaks_per_second = float(waveform_service.peaks_per_second)
+    if len(peaks):
+        peaks_per_second = peaks_per_second * len(peaks) / total
+    
+    return PeaksResponse(
+        recording_id=recording_id,
+        peaks_per_second=peaks_per_second,
+        length=len(peaks),
+        peaks=peaks.ravel().tolist()
+    )
+
+
+@router.get("/{recording_id}", response_model=RecordingResponse)
+async def get_recording(
+    recording_id: str,
+    request: Request,
+    response: Response,
+    current_user = Depends(get_current_user),
+    recording_repo: RecordingRepository = Depends(get_recording_repository)
+):
+    """Get a specific recording by ID"""
+    # Check ownership and validators before loading the transcript
+    version = recording_repo.get_recording_version(recording_id)
+    if not version:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Recording not found"
+        )
+    
+    user_id, recording_version = version
+    if user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view this recording"
+        )
+    
+    etag = f'W/"{recording_id}-{recording_version}"'
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    recording = recording_repo.get_recording(recording_id)
+    if not recording:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Recording not found"
+        )
+    
+    response.headers["ETag"] = f'W/"{recording_id}-{recording.version}"'
+    response.headers["Cache-Control"] = "private, no-cache"
+    
     return RecordingResponse(
         id=recording.id,
         user_id=recording.user_id,
         status=recording.status.value,
         audio_file_path=recording.audio_file_path,
         transcription_text=recording.transcription_text,
+        duration_seconds=recording.duration_seconds or 0.0,
         created_at=recording.created_at.isoformat(),
         updated_at=recording.updated_at.isoformat()
     )
\ No newline at end of file
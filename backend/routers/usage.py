@@ -0,0 +1,48 @@
+from datetime import date
+from fastapi import APIRouter, Depends
+from typing import List, Optional
+from repositories.interfaces import RecordingRepository
+from repositories.dependencies import get_recording_repository
+from routers.recordings import get_current_user
+from pydantic import BaseModel
+
+router = APIRouter(prefix="/usage", tags=["usage"])
+
+
+class UsageDay(BaseModel):
+    date: str
+    audio_seconds: float
+    chunk_count: int
+
+
+class UsageResponse(BaseModel):
+    user_id: str
+    total_seconds: float
+    total_minutes: float
+    days: List[UsageDay]
+
+
+@router.get("", response_model=UsageResponse)
+async def get_usage(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    current_user = Depends(get_current_user),
+    recording_repo: RecordingRepository = Depends(get_recording_repository)
+):
+    """Get the current user's recorded audio per day, read from the usage rollups"""
+    rollups = recording_repo.get_usage(current_user.id, start, end)
+    total_seconds = sum(r.audio_seconds for r in rollups)
+    
+    return UsageResponse(
+        user_id=current_user.id,
+        total_seconds=total_seconds,
+        total_minutes=total_seconds / 60.0,
+        days=[
+            UsageDay(
+                date=r.usage_date.isoformat(),
+                audio_seconds=r.audio_seconds,
+                chunk_count=r.chunk_count
+            )
+            for r in rollups
+        ]
+    )
@@ -0,0 +1,149 @@
+"""
+Benchmark random UUID4 VARCHAR(36) keys against UUIDv7 BINARY(16) keys.
+
+Inserts rows shaped like recording_chunks (primary key plus an indexed
+recording_id) into one table per key layout and reports insert rate and
+on-disk data/index size. Against MySQL the tables are created in the
+configured database and dropped afterwards; with a sqlite URL each layout
+gets its own database file so sizes can be compared.
+
+    python -m scripts.benchmark_uuid_keys --rows 200000
+    python -m scripts.benchmark_uuid_keys --url sqlite:////tmp/bench.db
+"""
+import argparse
+import os
+import time
+import uuid
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, text
+from config import settings
+from models.types import BinaryUUID, uuid7
+
+
+CHUNKS_PER_RECORDING = 60
+
+LAYOUTS = {
+    "uuid4_varchar36": (String(36), lambda: str(uuid.uuid4())),
+    "uuid7_binary16": (BinaryUUID(), lambda: str(uuid7())),
+}
+
+
+def make_table(metadata: MetaData, name: str, key_type) -> Table:
+    return Table(
+        f"bench_chunks_{name}",
+        metadata,
+        Column("id", key_type, primary_key=True),
+        Column("recording_id", key_type, nullable=False, index=True),
+        Column("chunk_index", Integer, nullable=False),
+        Column("audio_blob_path", String(512), nullable=False),
+    )
+
+
+def engine_for(url: str, name: str):
+    if url.startswith("sqlite:///"):
+        root, ext = os.path.splitext(url[len("sqlite:///"):])
+        path = f"{root}_{name}{ext or '.db'}"
+        if os.path.exists(path):
+            os.remove(path)
+        return create_engine(f"sqlite:///{path}"), path
+    return create_engine(url), None
+
+
+def table_size(engine, table: Table, sqlite_path: str) -> tuple:
+    """Return (data bytes, index bytes)"""
+    if sqlite_path:
+        with engine.connect() as conn:
+            try:
+                rows = conn.execute(
+                    text("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name")
+                ).fetchall()
+                sizes = dict(rows)
+                data = sizes.get(table.name, 0)
+                return data, sum(v for k, v in sizes.items() if k != table.name and not k.startswith("sqlite_"))
+            except Exception:
+                # dbstat not compiled in: report the whole file as data
+                return os.path.getsize(sqlite_path), 0
+
+    with engine.begin() as conn:
+        conn.execute(text(f"ANALYZE TABLE `{table.name}`"))
+        row = conn.execute(
+            text(
+                "SELECT DATA_LENGTH, INDEX_LENGTH FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :name"
+            ),
+            {"name": table.name},
+        ).first()
+    return int(row[0]), int(row[1])
+
+
+def run_layout(url: str, name: str, rows: int, batch: int) -> dict:
+    key_type, make_id = LAYOUTS[name]
+    engine, sqlite_path = engine_for(url, name)
+    metadata = MetaData()
+    table = make_table(metadata, name, key_type)
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+
+    recording_id = make_id()
+    started = time.perf_counter()
+    inserted = 0
+    with engine.connect() as conn:
+        while inserted < rows:
+            values = []
+            for _ in range(min(batch, rows - inserted)):
+                if inserted % CHUNKS_PER_RECORDING == 0:
+                    recording_id = make_id()
+                values.append({
+                    "id": make_id(),
+                    "recording_id": recording_id,
+                    "chunk_index": inserted % CHUNKS_PER_RECORDING,
+                    "audio_blob_path": f"/app/audio_storage/chunks/{recording_id}/chunk_{inserted}.webm",
+                })
+                inserted += 1
+            conn.execute(table.insert(), values)
+            conn.commit()
+    elapsed = time.perf_counter() - started
+
+    data_bytes, index_bytes = table_size(engine, table, sqlite_path)
+    if not sqlite_path:
+        metadata.drop_all(engine)
+    engine.dispose()
+
+    return {
+        "layout": name,
+        "rows": rows,
+        "seconds": elapsed,
+        "rows_per_second": rows / elapsed if elapsed else 0.0,
+        "data_bytes": data_bytes,
+        "index_bytes": index_bytes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=settings.MYSQL_URL, help="database URL (default: MYSQL_URL)")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--batch", type=int, default=500, help="rows per insert transaction")
+    args = parser.parse_args()
+
+    results = [run_layout(args.url, name, args.rows, args.batch) for name in LAYOUTS]
+
+    print(f"{'layout':<18}{'rows/s':>12}{'data MB':>12}{'index MB':>12}{'total MB':>12}")
+    for r in results:
+        total = r["data_bytes"] + r["index_bytes"]
+        print(
+            f"{r['layout']:<18}{r['rows_per_second']:>12.0f}"
+            f"{r['data_bytes'] / 1e6:>12.2f}{r['index_bytes'] / 1e6:>12.2f}{total / 1e6:>12.2f}"
+        )
+
+    base, new = results
+    base_total = base["data_bytes"] + base["index_bytes"]
+    new_total = new["data_bytes"] + new["index_bytes"]
+    if base["rows_per_second"] and base_total:
+        print(
+            f"\ninsert rate x{new['rows_per_second'] / base['rows_per_second']:.2f}, "
+            f"size {100.0 * (new_total - base_total) / base_total:+.1f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Bring an existing MySQL database up to the current models.
+
+init_db() only creates missing tables; it never alters existing ones. Each
+migration below adds what one change introduced and is skipped when it is
+already applied, so the script can be re-run safely after every deploy.
+
+Convert UUID keys first (scripts.migrate_uuid_binary), then run from the
+backend directory:
+
+    python -m scripts.migrate_schema            # apply
+    python -m scripts.migrate_schema --dry-run  # print the SQL only
+"""
+import argparse
+from dataclasses import dataclass
+from typing import Callable, List
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateTable
+from database import Base, engine
+import models  # noqa: F401  (registers all tables on Base.metadata)
+
+
+def column_exists(conn: Connection, table: str, column: str) -> bool:
+    return bool(conn.execute(
+        text(
+            "SELECT COUNT(*) FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND COLUMN_NAME = :column"
+        ),
+        {"table": table, "column": column},
+    ).scalar())
+
+
+def column_type(conn: Connection, table: str, column: str) -> str:
+    """Full column type, e.g. "enum('active','paused')"; empty if the column is missing"""
+    return conn.execute(
+        text(
+            "SELECT COLUMN_TYPE FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND COLUMN_NAME = :column"
+        ),
+        {"table": table, "column": column},
+    ).scalar() or ""
+
+
+def table_exists(conn: Connection, table: str) -> bool:
+    return bool(conn.execute(
+        text("SELECT COUNT(*) FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table"),
+        {"table": table},
+    ).scalar())
+
+
+def index_exists(conn: Connection, table: str, index: str) -> bool:
+    return bool(conn.execute(
+        text(
+            "SELECT COUNT(*) FROM information_schema.STATISTICS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND INDEX_NAME = :index"
+        ),
+        {"table": table, "index": index},
+    ).scalar())
+
+
+@dataclass
+class Migration:
+    name: str
+    applied: Callable[[Connection], bool]
+    statements: List[str]
+
+
+MIGRATIONS = [
+    Migration(
+        "recording_chunks.peaks (waveform peaks)",
+        lambda conn: column_exists(conn, "recording_chunks", "peaks"),
+        ["ALTER TABLE `recording_chunks` ADD COLUMN `peaks` BLOB NULL"],
+    ),
+    Migration(
+        "recording_chunks unique (recording_id, chunk_index), dropping retried duplicates",
+        lambda conn: index_exists(conn, "recording_chunks", "uq_recording_chunks_recording_index"),
+        [
+            "DELETE newer FROM `recording_chunks` newer JOIN `recording_chunks` older "
+            "ON newer.recording_id = older.recording_id AND newer.chunk_index = older.chunk_index "
+            "AND newer.id > older.id",
+            "ALTER TABLE `recording_chunks` ADD CONSTRAINT `uq_recording_chunks_recording_index` "
+            "UNIQUE (`recording_id`, `chunk_index`)",
+        ],
+    ),
+    Migration(
+        "recordings.duration_seconds, backfilled from chunk durations",
+        lambda conn: column_exists(conn, "recordings", "duration_seconds"),
+        [
+            "ALTER TABLE `recordings` ADD COLUMN `duration_seconds` FLOAT NOT NULL DEFAULT 0",
+            "UPDATE `recordings` r SET `duration_seconds` = ("
+            "SELECT COALESCE(SUM(c.duration_seconds), 0) FROM `recording_chunks` c WHERE c.recording_id = r.id)",
+        ],
+    ),
+    Migration(
+        # Startup may already have created the table empty, so backfill whenever it has no rows
+        "usage_rollups, backfilled from chunk uploads",
+        lambda conn: table_exists(conn, "usage_rollups") and bool(
+            conn.execute(text("SELECT COUNT(*) FROM `usage_rollups`")).scalar()
+            or not conn.execute(text("SELECT COUNT(*) FROM `recording_chunks`")).scalar()
+        ),
+        [
+            str(CreateTable(Base.metadata.tables["usage_rollups"], if_not_exists=True).compile(dialect=engine.dialect)),
+            "INSERT INTO `usage_rollups` (user_id, usage_date, audio_seconds, chunk_count, updated_at) "
+            "SELECT r.user_id, DATE(c.uploaded_at), COALESCE(SUM(c.duration_seconds), 0), COUNT(*), UTC_TIMESTAMP() "
+            "FROM `recording_chunks` c JOIN `recordings` r ON r.id = c.recording_id "
+            "GROUP BY r.user_id, DATE(c.uploaded_at)",
+        ],
+    ),
+    Migration(
+        "recordings.version (ETag validator)",
+        lambda conn: column_exists(conn, "recordings", "version"),
+        ["ALTER TABLE `recordings` ADD COLUMN `version` INT NOT NULL DEFAULT 1"],
+    ),
+    Migration(
+        "recordings.status 'finishing' (finish lease)",
+        lambda conn: "'finishing'" in column_type(conn, "recordings", "status"),
+        ["ALTER TABLE `recordings` MODIFY `status` ENUM('active','paused','finishing','ended') NOT NULL"],
+    ),
+    Migration(
+        "recordings (status, updated_at) index for the stale-recording reaper",
+        lambda conn: index_exists(conn, "recordings", "ix_recordings_status_updated_at"),
+        ["CREATE INDEX `ix_recordings_status_updated_at` ON `recordings` (`status`, `updated_at`)"],
+    ),
+    Migration(
+        "recordings.status 'failed' (abandoned without audio)",
+        lambda conn: "'failed'" in column_type(conn, "recordings", "status"),
+        ["ALTER TABLE `recordings` MODIFY `status` ENUM('active','paused','finishing','ended','failed') NOT NULL"],
+    ),
+    Migration(
+        # Existing chunk rows of ended recordings are compacted by the maintenance pass
+        "recordings.chunk_manifest (compacted chunk metadata)",
+        lambda conn: column_exists(conn, "recordings", "chunk_manifest"),
+        ["ALTER TABLE `recordings` ADD COLUMN `chunk_manifest` MEDIUMBLOB NULL"],
+    ),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="print the SQL without executing it")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "mysql":
+        raise SystemExit("This migration only applies to MySQL; other databases are created from the models")
+
+    with engine.begin() as conn:
+        if column_type(conn, "users", "id").startswith(("char", "varchar")):
+            raise SystemExit("Convert UUID keys first: python -m scripts.migrate_uuid_binary")
+
+        pending = [m for m in MIGRATIONS if not m.applied(conn)]
+        if not pending:
+            print("Schema is up to date; nothing to do")
+            return
+        for migration in pending:
+            print(f"-- {migration.name}")
+            for statement in migration.statements:
+                print(statement.strip() + ";")
+                if not args.dry_run:
+                    conn.execute(text(statement))
+
+    if not args.dry_run:
+        print("Migration complete")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Migrate UUID key columns from CHAR/VARCHAR(36) to BINARY(16) on MySQL.
+
+Existing UUID4 values are converted in place (UNHEX of the hex digits), so
+every ID the API has handed out keeps the same string form. New rows get
+time-ordered UUIDv7 keys from the models.
+
+MySQL DDL is not transactional, so take a backup first. Run from the
+backend directory, with the application stopped:
+
+    python -m scripts.migrate_uuid_binary            # apply
+    python -m scripts.migrate_uuid_binary --dry-run  # print the SQL only
+"""
+import argparse
+from sqlalchemy import text
+from sqlalchemy.schema import AddConstraint, CreateIndex
+from database import Base, engine
+import models  # noqa: F401  (registers all tables on Base.metadata)
+
+
+# table -> UUID columns to convert, primary key columns first
+UUID_COLUMNS = {
+    "users": ["id"],
+    "recordings": ["id", "user_id"],
+    "recording_chunks": ["id", "recording_id"],
+    "usage_rollups": ["user_id"],
+}
+
+
+def column_type(conn, table: str, column: str) -> str:
+    return conn.execute(
+        text(
+            "SELECT DATA_TYPE FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND COLUMN_NAME = :column"
+        ),
+        {"table": table, "column": column},
+    ).scalar()
+
+
+def existing_tables(conn) -> set:
+    rows = conn.execute(text("SELECT TABLE_NAME FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE()"))
+    return {row[0] for row in rows}
+
+
+def build_statements(conn) -> list:
+    tables = [t for t in UUID_COLUMNS if t in existing_tables(conn)]
+    pending = [t for t in tables if column_type(conn, t, UUID_COLUMNS[t][0]) != "binary"]
+    if not pending:
+        return []
+
+    statements = []
+
+    # 1. Drop foreign keys touching the converted tables
+    foreign_keys = conn.execute(
+        text(
+            "SELECT CONSTRAINT_NAME, TABLE_NAME FROM information_schema.REFERENTIAL_CONSTRAINTS "
+            "WHERE CONSTRAINT_SCHEMA = DATABASE()"
+        )
+    ).fetchall()
+    for name, table in foreign_keys:
+        if table in pending:
+            statements.append(f"ALTER TABLE `{table}` DROP FOREIGN KEY `{name}`")
+
+    # 2. Add binary shadow columns and copy the converted values
+    for table in pending:
+        for column in UUID_COLUMNS[table]:
+            statements.append(f"ALTER TABLE `{table}` ADD COLUMN `{column}__bin` BINARY(16) NULL")
+            statements.append(
+                f"UPDATE `{table}` SET `{column}__bin` = UNHEX(REPLACE(`{column}`, '-', ''))"
+            )
+
+    # 3. Swap the columns and rebuild the primary key
+    for table in pending:
+        metadata_table = Base.metadata.tables[table]
+        primary_key = [c.name for c in metadata_table.primary_key.columns]
+        clauses = ["DROP PRIMARY KEY"]
+        for column in UUID_COLUMNS[table]:
+            clauses.append(f"DROP COLUMN `{column}`")
+        for column in UUID_COLUMNS[table]:
+            clauses.append(f"CHANGE COLUMN `{column}__bin` `{column}` BINARY(16) NOT NULL")
+        clauses.append("ADD PRIMARY KEY (" + ", ".join(f"`{c}`" for c in primary_key) + ")")
+        statements.append(f"ALTER TABLE `{table}` " + ", ".join(clauses))
+
+    # 4. Recreate secondary indexes dropped with the old columns, then foreign keys
+    for table in pending:
+        metadata_table = Base.metadata.tables[table]
+        for index in metadata_table.indexes:
+            if any(c.name in UUID_COLUMNS[table] for c in index.columns):
+                statements.append(str(CreateIndex(index).compile(dialect=engine.dialect)))
+    for table in pending:
+        for constraint in Base.metadata.tables[table].foreign_key_constraints:
+            statements.append(str(AddConstraint(constraint).compile(dialect=engine.dialect)))
+
+    return statements
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="print the SQL without executing it")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "mysql":
+        raise SystemExit("This migration only applies to MySQL; other databases are created with BINARY(16) keys")
+
+    with engine.begin() as conn:
+        statements = build_statements(conn)
+        if not statements:
+            print("UUID columns are already BINARY(16); nothing to do")
+            return
+        for statement in statements:
+            print(statement.strip() + ";")
+            if not args.dry_run:
+                conn.execute(text(statement))
+
+    if not args.dry_run:
+        print("Migration complete")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,8 @@
 from .auth_service import AuthService
-from .recording_service import RecordingService
+from .recording_service import RecordingService, FinishInProgressError
+from .waveform_service import WaveformService
+from .export_service import ExportService
+from .maintenance_service import MaintenanceService, MaintenanceWorker, MaintenanceReport
 
-__all__ = ["AuthService", "RecordingService"]
\ No newline at end of file
+__all__ = ["AuthService", "RecordingService", "FinishInProgressError", "WaveformService", "ExportService",
+           "MaintenanceService", "MaintenanceWorker", "MaintenanceReport"]
\ No newline at end of file
@@ -2,14 +2,14 @@ from datetime import datetime, timedelta
 from typing import Optional
 from jose import jwt, JWTError
 from config import settings
-from repositories.mysql_repository import MySQLUserRepository
+from repositories.interfaces import UserRepository
 from models import User
 
 
 class AuthService:
     """Service for handling authentication and authorization"""
     
-    def __init__(self, user_repository: MySQLUserRepository):
+    def __init__(self, user_repository: UserRepository):
         self.user_repository = user_repository
     
     def create_access_token(self, user_id: str) -> str:
@@ -0,0 +1,129 @@
+import io
+import json
+import os
+import tarfile
+import time
+import zipfile
+from typing import Iterable, Iterator, List, Tuple
+from models import Recording
+
+
+# Size of the blocks audio files are read and emitted in
+EXPORT_BLOCK_SIZE = 1024 * 1024
+
+
+class _StreamBuffer(io.RawIOBase):
+    """
+    Write-only sink that hands written bytes back to a generator.
+
+    It deliberately has no tell()/seek(), so zipfile falls back to its
+    streaming mode with data descriptors.
+    """
+
+    def __init__(self):
+        self._pending: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        if data:
+            self._pending.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._pending)
+        self._pending.clear()
+        return data
+
+
+class ExportService:
+    """Service for streaming bulk exports of recordings and transcripts"""
+
+    FORMATS = ("zip", "tar")
+
+    def entries(self, recording: Recording) -> Iterator[Tuple[str, object]]:
+        """
+        Build the archive entries for one recording.
+
+        Yields:
+            (archive name, bytes) for transcripts and (archive name, path) for audio
+        """
+        folder = f"{recording.created_at:%Y%m%d-%H%M%S}_{recording.id}"
+        metadata = {
+            "id": recording.id,
+            "user_id": recording.user_id,
+            "status": recording.status.value,
+            "llm_provider": recording.llm_provider,
+            "duration_seconds": recording.duration_seconds,
+            "transcription_text": recording.transcription_text,
+            "created_at": recording.created_at.isoformat(),
+            "updated_at": recording.updated_at.isoformat(),
+        }
+        yield f"{folder}/transcript.json", json.dumps(metadata, indent=2).encode("utf-8")
+        yield f"{folder}/transcript.txt", (recording.transcription_text or "").encode("utf-8")
+
+        if recording.audio_file_path and os.path.exists(recording.audio_file_path):
+            extension = os.path.splitext(recording.audio_file_path)[1]
+            yield f"{folder}/audio{extension}", recording.audio_file_path
+
+    def stream_zip(self, recordings: Iterable[Recording]) -> Iterator[bytes]:
+        """Stream a ZIP archive of the given recordings in constant memory"""
+        sink = _StreamBuffer()
+        with zipfile.ZipFile(sink, mode="w", allowZip64=True) as archive:
+            for recording in recordings:
+                for name, content in self.entries(recording):
+                    if isinstance(content, bytes):
+                        archive.writestr(name, content, compress_type=zipfile.ZIP_DEFLATED)
+                        yield sink.drain()
+                        continue
+
+                    # Audio is already compressed; store it and copy block by block
+                    info = zipfile.ZipInfo(name, date_time=time.localtime(os.path.getmtime(content))[:6])
+                    info.compress_type = zipfile.ZIP_STORED
+                    with archive.open(info, mode="w", force_zip64=True) as dest, open(content, "rb") as src:
+                        for block in iter(lambda: src.read(EXPORT_BLOCK_SIZE), b""):
+                            dest.write(block)
+                            yield sink.drain()
+                    yield sink.drain()
+        yield sink.drain()
+
+    def stream_tar(self, recordings: Iterable[Recording]) -> Iterator[bytes]:
+        """Stream an uncompressed tar archive of the given recordings in constant memory"""
+        for recording in recordings:
+            for name, content in self.entries(recording):
+                info = tarfile.TarInfo(name)
+                info.mode = 0o644
+                if isinstance(content, bytes):
+                    info.size = len(content)
+                    info.mtime = int(time.time())
+                    yield info.tobuf(format=tarfile.PAX_FORMAT)
+                    yield content
+                else:
+                    info.size = os.path.getsize(content)
+                    info.mtime = int(os.path.getmtime(content))
+                    yield info.tobuf(format=tarfile.PAX_FORMAT)
+                    written = 0
+                    with open(content, "rb") as src:
+                        for block in iter(lambda: src.read(EXPORT_BLOCK_SIZE), b""):
+                            # Never emit more than the header promised if the file grew
+                            block = block[:info.size - written]
+                            written += len(block)
+                            yield block
+                            if written >= info.size:
+                                break
+                    # Pad with zeros if the file shrank while streaming
+                    if written < info.size:
+                        yield b"\0" * (info.size - written)
+
+                remainder = info.size % tarfile.BLOCKSIZE
+                if remainder:
+                    yield b"\0" * (tarfile.BLOCKSIZE - remainder)
+
+        # End-of-archive marker: two zero blocks
+        yield b"\0" * (tarfile.BLOCKSIZE * 2)
+
+    def stream(self, recordings: Iterable[Recording], format: str) -> Iterator[bytes]:
+        """Stream an archive in the requested format, skipping empty writes"""
+        blocks = self.stream_tar(recordings) if format == "tar" else self.stream_zip(recordings)
+        return (block for block in blocks if block)
@@ -0,0 +1,253 @@
+import logging
+import os
+import shutil
+import threading
+import time
+from dataclasses import dataclass, asdict, field
+from datetime import datetime, timedelta
+from contextlib import nullcontext
+from typing import Callable, ContextManager, List, Optional, Tuple
+from repositories.interfaces import RecordingRepository
+from services.recording_service import RecordingService
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MaintenanceReport:
+    """What one maintenance pass did and reclaimed"""
+    started_at: str = ""
+    finished_at: str = ""
+    finalized: int = 0
+    expired: int = 0
+    failed: int = 0
+    finalize_failures: int = 0
+    orphan_dirs_removed: int = 0
+    orphan_files_removed: int = 0
+    bytes_reclaimed: int = 0
+    dangling_chunk_rows_removed: int = 0
+    chunk_rows_compacted: int = 0
+    missing_audio_cleared: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def _path_size(path: str) -> int:
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class MaintenanceService:
+    """Service for reaping abandoned recordings and garbage-collecting audio storage"""
+
+    def __init__(self, recording_repository: RecordingRepository, recording_service: RecordingService):
+        self.recording_repository = recording_repository
+        self.recording_service = recording_service
+        self.storage_path = settings.AUDIO_STORAGE_PATH
+
+    def reap_stale_recordings(self, report: MaintenanceReport) -> None:
+        """
+        Finish or expire recordings left active/paused past the idle TTL.
+
+        Recordings with chunks go through the normal finish path; recordings
+        without chunks are deleted, and ones whose chunk files are all gone
+        are marked failed rather than transcribed from an empty file. Work is limited to one batch per pass
+        and paced by MAINTENANCE_FINISH_INTERVAL_SECONDS between finishes.
+        """
+        now = datetime.utcnow()
+        stale = self.recording_repository.list_stale_recordings(
+            idle_before=now - timedelta(seconds=settings.MAINTENANCE_IDLE_TTL_SECONDS),
+            lease_before=now - timedelta(seconds=settings.FINISH_LEASE_SECONDS),
+            limit=settings.MAINTENANCE_BATCH_SIZE
+        )
+        stale_ids = [recording.id for recording in stale]
+
+        for recording_id in stale_ids:
+            chunks = self.recording_repository.get_chunks(recording_id)
+            if not chunks:
+                if self.recording_repository.delete_recording(recording_id):
+                    self._remove(os.path.join(self.storage_path, "chunks", recording_id), report)
+                    report.expired += 1
+                continue
+            if not any(os.path.exists(chunk.audio_blob_path) for chunk in chunks):
+                if self.recording_repository.mark_failed(recording_id):
+                    report.failed += 1
+                continue
+
+            try:
+                self.recording_service.finish_recording(recording_id)
+                report.finalized += 1
+            except Exception as e:
+                report.finalize_failures += 1
+                report.errors.append(f"finish {recording_id}: {e}")
+            time.sleep(settings.MAINTENANCE_FINISH_INTERVAL_SECONDS)
+
+    def collect_orphan_files(self, report: MaintenanceReport) -> None:
+        """
+        Remove chunk directories and assembled files that have no recording row.
+
+        Anything modified within MAINTENANCE_ORPHAN_GRACE_SECONDS is left alone
+        so uploads racing with recording creation are never collected.
+        """
+        grace_cutoff = time.time() - settings.MAINTENANCE_ORPHAN_GRACE_SECONDS
+
+        chunks_root = os.path.join(self.storage_path, "chunks")
+        if os.path.isdir(chunks_root):
+            candidates = [
+                entry for entry in os.scandir(chunks_root)
+                if entry.is_dir() and entry.stat().st_mtime < grace_cutoff
+            ]
+            for batch in self._batches(candidates):
+                existing = self.recording_repository.existing_recording_ids(e.name for e in batch)
+                for entry in batch:
+                    if entry.name not in existing:
+                        self._remove(entry.path, report)
+                        report.orphan_dirs_removed += 1
+
+        if os.path.isdir(self.storage_path):
+            candidates = [
+                entry for entry in os.scandir(self.storage_path)
+                if entry.is_file()
+                and entry.name.endswith((".wav", ".partial"))
+                and entry.stat().st_mtime < grace_cutoff
+            ]
+            for batch in self._batches(candidates):
+                recording_ids = [entry.name.split(".", 1)[0] for entry in batch]
+                existing = self.recording_repository.existing_recording_ids(recording_ids)
+                for entry, recording_id in zip(batch, recording_ids):
+                    # Leftover .partial files are always safe to drop once past the grace period
+                    if recording_id not in existing or entry.name.endswith(".partial"):
+                        self._remove(entry.path, report)
+                        report.orphan_files_removed += 1
+
+    def collect_dangling_rows(self, report: MaintenanceReport) -> None:
+        """
+        Delete chunk rows of unfinished recordings whose file is gone and clear
+        missing assembled audio paths.
+
+        Ended recordings are left alone: their manifest entries (and late rows
+        awaiting compaction) carry the peaks and durations the waveform is
+        drawn from, whether or not the chunk file is still on disk.
+        """
+        missing_chunks = [
+            chunk_id for chunk_id, path in self.recording_repository.iter_chunk_files()
+            if not os.path.exists(path)
+        ]
+        for batch in self._batches(missing_chunks):
+            report.dangling_chunk_rows_removed += self.recording_repository.delete_chunks(batch)
+
+        missing_audio = [
+            recording_id for recording_id, path in self.recording_repository.iter_audio_files()
+            if not os.path.exists(path)
+        ]
+        for recording_id in missing_audio:
+            self.recording_repository.clear_audio_file(recording_id)
+            report.missing_audio_cleared += 1
+
+    def compact_ended_chunks(self, report: MaintenanceReport) -> None:
+        """Fold chunk rows left behind for ended recordings (late uploads, older data) into manifests"""
+        for recording_id in self.recording_repository.list_uncompacted_recordings(settings.MAINTENANCE_BATCH_SIZE):
+            report.chunk_rows_compacted += self.recording_repository.compact_chunks(recording_id)
+    
+    def run(self) -> MaintenanceReport:
+        """Run one full maintenance pass and report what was reclaimed"""
+        report = MaintenanceReport(started_at=datetime.utcnow().isoformat())
+        for step in (
+            self.reap_stale_recordings,
+            self.collect_orphan_files,
+            self.collect_dangling_rows,
+            self.compact_ended_chunks
+        ):
+            try:
+                step(report)
+            except Exception as e:
+                report.errors.append(f"{step.__name__}: {e}")
+                logger.exception("Maintenance step %s failed", step.__name__)
+        report.finished_at = datetime.utcnow().isoformat()
+        return report
+
+    def _remove(self, path: str, report: MaintenanceReport) -> None:
+        try:
+            size = _path_size(path)
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+            report.bytes_reclaimed += size
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            report.errors.append(f"remove {path}: {e}")
+
+    @staticmethod
+    def _batches(items: list) -> List[list]:
+        size = settings.MAINTENANCE_BATCH_SIZE
+        return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+class MaintenanceWorker:
+    """Daemon thread running maintenance passes at a fixed interval"""
+
+    def __init__(
+        self,
+        service_factory: Callable[[], Tuple[MaintenanceService, Callable[[], None]]],
+        interval: float = None,
+        lock: Callable[[], ContextManager[bool]] = None
+    ):
+        """
+        Args:
+            service_factory: Returns (MaintenanceService, close callback) for one pass
+            interval: Seconds between passes
+            lock: Returns a context manager yielding whether this process may
+                run the pass; every worker process starts a thread, so this
+                keeps passes from running concurrently
+        """
+        self.service_factory = service_factory
+        self.interval = interval or settings.MAINTENANCE_INTERVAL_SECONDS
+        self.lock = lock or (lambda: nullcontext(True))
+        self.last_report: Optional[MaintenanceReport] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="maintenance", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run_once(self) -> Optional[MaintenanceReport]:
+        """Run one pass, or return None if another process holds the lock"""
+        with self.lock() as acquired:
+            if not acquired:
+                logger.debug("Maintenance pass skipped; another process is running it")
+                return None
+            service, close = self.service_factory()
+            try:
+                report = service.run()
+            finally:
+                close()
+        self.last_report = report
+        logger.info("Maintenance pass finished: %s", report.to_dict())
+        return report
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Maintenance pass failed")
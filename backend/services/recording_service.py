@@ -1,17 +1,37 @@
+import asyncio
+import logging
 import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 from typing import List
-from repositories.mysql_repository import MySQLRecordingRepository
-from llm.requestyai_provider import RequestYaiProvider
+from fastapi.concurrency import run_in_threadpool
+from repositories.interfaces import RecordingRepository
+from llm.routing import ProviderRouter, RoutedTranscription
 from models import Recording
+from models.recording import RecordingStatus
+from services.single_flight import SingleFlight
 from config import settings
 
+logger = logging.getLogger(__name__)
+
+
+class FinishInProgressError(Exception):
+    """Raised when another worker is still finishing the recording"""
+
+
+# Concurrent finishes of the same recording within this process share one run
+_finish_flights = SingleFlight()
+
 
 class RecordingService:
     """Service for handling recording operations"""
     
-    def __init__(self, recording_repository: MySQLRecordingRepository, llm_provider: RequestYaiProvider):
+    def __init__(self, recording_repository: RecordingRepository, llm_router: ProviderRouter):
         self.recording_repository = recording_repository
-        self.llm_provider = llm_provider
+        self.llm_router = llm_router
     
     def assemble_chunks(self, recording_id: str) -> str:
         """
@@ -38,51 +58,139 @@ class RecordingService:
         # Ensure storage directory exists
         os.makedirs(settings.AUDIO_STORAGE_PATH, exist_ok=True)
         
-        # Concatenate all chunks into a single file
-        with open(output_path, 'wb') as outfile:
+        # Never send an empty file to the transcription providers
+        if not any(os.path.exists(chunk.audio_blob_path) for chunk in chunks):
+            raise ValueError(f"No chunk audio left for recording {recording_id}")
+        
+        # Concatenate all chunks into a temporary file, then publish it atomically;
+        # the file is private to this finisher in case a second one takes over the lease
+        partial_path = f"{output_path}.{uuid.uuid4().hex}.partial"
+        with open(partial_path, 'wb') as outfile:
             for chunk in chunks:
                 if os.path.exists(chunk.audio_blob_path):
                     with open(chunk.audio_blob_path, 'rb') as infile:
                         outfile.write(infile.read())
+        os.replace(partial_path, output_path)
         
         return output_path
     
-    def transcribe_recording(self, audio_path: str) -> str:
+    def transcribe_recording(self, audio_path: str) -> RoutedTranscription:
         """
-        Transcribe audio file using LLM provider
+        Transcribe audio file using the routed LLM providers
         
         Args:
             audio_path: Path to the audio file
             
         Returns:
-            Transcribed text
+            Transcribed text and the name of the provider that served it
         """
-        return self.llm_provider.transcribe_audio(audio_path)
+        return self.llm_router.transcribe(audio_path)
     
     def finish_recording(self, recording_id: str) -> Recording:
         """
         Finish a recording: assemble chunks, transcribe, and update database
         
+        Concurrent calls for the same recording run the work once. Within a
+        process they share a single in-flight call; across workers the
+        finishing status acts as a lease, renewed while the work runs.
+        Finishing an ended recording returns it unchanged.
+        
         Args:
             recording_id: ID of the recording to finish
             
         Returns:
             Updated Recording object
+        
+        Raises:
+            FinishInProgressError: if another worker holds the finishing lease
+        """
+        _finish_flights.do(recording_id, lambda: self._claim_and_finish(recording_id))
+        
+        # Followers (and the leader) re-read so the result reflects the finished row
+        recording = self.recording_repository.refresh_recording(recording_id)
+        if not recording:
+            raise ValueError(f"Recording {recording_id} not found")
+        return recording
+    
+    async def finish_or_wait(self, recording_id: str) -> Recording:
         """
-        # Assemble audio chunks
-        audio_path = self.assemble_chunks(recording_id)
+        Finish a recording, or wait for the worker that holds its lease.
         
-        # Transcribe audio
-        transcription = self.transcribe_recording(audio_path)
+        Waiting happens on the event loop: between polls no thread is held
+        and the repository's connection is back in the pool.
+        
+        Raises:
+            FinishInProgressError: if it is still being finished after FINISH_WAIT_TIMEOUT_SECONDS
+        """
+        deadline = time.monotonic() + settings.FINISH_WAIT_TIMEOUT_SECONDS
+        self.recording_repository.release_connection()
+        while True:
+            if not _finish_flights.in_flight(recording_id):
+                try:
+                    return await run_in_threadpool(self.finish_recording, recording_id)
+                except FinishInProgressError:
+                    pass
+            if time.monotonic() >= deadline:
+                raise FinishInProgressError(f"Recording {recording_id} is already being finished")
+            await asyncio.sleep(settings.FINISH_POLL_INTERVAL_SECONDS)
+    
+    def _claim_and_finish(self, recording_id: str) -> None:
+        stale_before = datetime.utcnow() - timedelta(seconds=settings.FINISH_LEASE_SECONDS)
+        previous = self.recording_repository.claim_finish(recording_id, stale_before)
+        if previous is not None:
+            with self._renewing_lease(recording_id):
+                self._run_finish(recording_id, previous)
+            return
+        
+        recording = self.recording_repository.refresh_recording(recording_id)
+        if not recording:
+            raise ValueError(f"Recording {recording_id} not found")
+        if recording.status == RecordingStatus.failed:
+            raise ValueError(f"Recording {recording_id} failed: none of its audio is left")
+        if recording.status != RecordingStatus.ended:
+            raise FinishInProgressError(f"Recording {recording_id} is already being finished")
+    
+    @contextmanager
+    def _renewing_lease(self, recording_id: str):
+        """Renew the finishing lease in the background until the block exits"""
+        stop = threading.Event()
+        
+        def renew():
+            while not stop.wait(settings.FINISH_LEASE_SECONDS / 3):
+                try:
+                    if not self.recording_repository.renew_finish(recording_id):
+                        return
+                except Exception:
+                    logger.exception("Renewing the finish lease of %s failed", recording_id)
+        
+        thread = threading.Thread(target=renew, name=f"finish-lease-{recording_id}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+    
+    def _run_finish(self, recording_id: str, previous: RecordingStatus) -> None:
+        try:
+            # Assemble audio chunks
+            audio_path = self.assemble_chunks(recording_id)
+            
+            # Transcribe audio
+            transcription = self.transcribe_recording(audio_path)
+        except Exception:
+            # Let the client retry the finish
+            restored = RecordingStatus.paused if previous == RecordingStatus.finishing else previous
+            self.recording_repository.release_finish(recording_id, restored)
+            raise
         
         # Update recording in database
         recording = self.recording_repository.mark_ended(
             recording_id=recording_id,
             audio_file_path=audio_path,
-            transcription=transcription
+            transcription=transcription.text,
+            llm_provider=transcription.provider
         )
         
         if not recording:
             raise ValueError(f"Recording {recording_id} not found")
-        
-        return recording
\ No newline at end of file
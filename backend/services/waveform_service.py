@@ -0,0 +1,145 @@
+import math
+import subprocess
+from typing import List, Optional
+import numpy as np
+from config import settings
+
+
+# EBML header magic that starts a self-contained WebM stream
+EBML_MAGIC = b"\x1a\x45\xdf\xa3"
+# Matroska Cluster element ID; everything before it is the init segment
+CLUSTER_ID = b"\x1f\x43\xb6\x75"
+
+
+class WaveformService:
+    """Service for computing downsampled waveform peaks from audio chunks"""
+
+    def __init__(self, sample_rate: int = None, peaks_per_second: int = None):
+        self.sample_rate = sample_rate or settings.WAVEFORM_SAMPLE_RATE
+        self.peaks_per_second = peaks_per_second or settings.WAVEFORM_PEAKS_PER_SECOND
+        self.samples_per_peak = max(1, self.sample_rate // self.peaks_per_second)
+
+    @staticmethod
+    def init_segment(first_chunk: bytes) -> bytes:
+        """
+        Extract the WebM init segment (EBML header, tracks) from the first chunk.
+
+        MediaRecorder only writes the header into the first timeslice, so later
+        chunks must be prefixed with it before they can be decoded on their own.
+        """
+        cluster_pos = first_chunk.find(CLUSTER_ID)
+        if cluster_pos == -1:
+            return first_chunk
+        return first_chunk[:cluster_pos]
+
+    def decode_pcm(self, audio: bytes) -> Optional[np.ndarray]:
+        """
+        Decode audio bytes to mono float32 PCM in [-1, 1] using ffmpeg.
+
+        Returns:
+            Sample array, or None if ffmpeg is unavailable or decoding failed
+        """
+        try:
+            result = subprocess.run(
+                [
+                    settings.FFMPEG_PATH, "-hide_banner", "-loglevel", "error",
+                    "-i", "pipe:0",
+                    "-f", "s16le", "-ac", "1", "-ar", str(self.sample_rate),
+                    "pipe:1",
+                ],
+                input=audio,
+                capture_output=True,
+                timeout=30,
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+
+        if not result.stdout:
+            return None
+
+        usable = len(result.stdout) - (len(result.stdout) % 2)
+        samples = np.frombuffer(result.stdout[:usable], dtype="<i2")
+        return samples.astype(np.float32) / 32768.0
+
+    def compute_peaks(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Compute min/max peaks over fixed-size sample windows.
+
+        Args:
+            samples: Mono PCM samples in [-1, 1]
+
+        Returns:
+            int8 array of shape (n, 2) holding (min, max) per window
+        """
+        if samples.size == 0:
+            return np.zeros((0, 2), dtype=np.int8)
+
+        block = self.samples_per_peak
+        pad = (-samples.size) % block
+        if pad:
+            samples = np.pad(samples, (0, pad), mode="edge")
+
+        windows = samples.reshape(-1, block)
+        peaks = np.stack([windows.min(axis=1), windows.max(axis=1)], axis=1)
+        return np.clip(np.round(peaks * 127), -127, 127).astype(np.int8)
+
+    def compute_chunk_peaks(self, chunk: bytes, init_segment: bytes = b"") -> Optional[bytes]:
+        """
+        Compute packed peaks for a single uploaded chunk.
+
+        Args:
+            chunk: Raw chunk bytes as uploaded
+            init_segment: WebM init segment to prepend to headerless chunks
+
+        Returns:
+            Packed int8 (min, max) pairs, or None if the chunk could not be decoded
+        """
+        audio = chunk if chunk.startswith(EBML_MAGIC) else init_segment + chunk
+        samples = self.decode_pcm(audio)
+        if samples is None:
+            return None
+        return self.compute_peaks(samples).tobytes()
+
+    @staticmethod
+    def unpack_peaks(packed: bytes) -> np.ndarray:
+        """Unpack stored peaks bytes into an (n, 2) int8 array"""
+        return np.frombuffer(packed, dtype=np.int8).reshape(-1, 2)
+
+    @staticmethod
+    def downsample_peaks(peaks: np.ndarray, factor: int) -> np.ndarray:
+        """
+        Merge adjacent peak pairs by `factor`, keeping the min of mins and max of maxes.
+        """
+        if factor <= 1 or len(peaks) == 0:
+            return peaks
+
+        pad = (-len(peaks)) % factor
+        if pad:
+            peaks = np.concatenate([peaks, np.repeat(peaks[-1:], pad, axis=0)])
+
+        groups = peaks.reshape(-1, factor, 2)
+        return np.stack([groups[:, :, 0].min(axis=1), groups[:, :, 1].max(axis=1)], axis=1)
+
+    def merge_peaks(self, packed_chunks: List[bytes], max_peaks: Optional[int] = None) -> np.ndarray:
+        """
+        Concatenate per-chunk peaks and reduce them to at most `max_peaks` pairs.
+
+        The reduction factor is rounded up to a power of two so repeated requests
+        at similar widths land on the same resolution levels.
+
+        Args:
+            packed_chunks: Stored peaks for each chunk, in chunk order
+            max_peaks: Upper bound on the number of (min, max) pairs returned
+
+        Returns:
+            int8 array of shape (n, 2)
+        """
+        arrays = [self.unpack_peaks(p) for p in packed_chunks if p]
+        if not arrays:
+            return np.zeros((0, 2), dtype=np.int8)
+
+        peaks = np.concatenate(arrays)
+        if max_peaks and len(peaks) > max_peaks:
+            factor = 2 ** math.ceil(math.log2(len(peaks) / max_peaks))
+            peaks = self.downsample_peaks(peaks, factor)
+        return peaks
@@ -0,0 +1,126 @@
+import struct
+from typing import Optional, Tuple
+
+
+# Matroska element IDs (with their length-marker bits kept)
+SEGMENT_ID = 0x18538067
+INFO_ID = 0x1549A966
+TIMECODE_SCALE_ID = 0x2AD7B1
+DURATION_ID = 0x4489
+TRACKS_ID = 0x1654AE6B
+CLUSTER_ID = 0x1F43B675
+SIMPLE_BLOCK_ID = 0xA3
+BLOCK_GROUP_ID = 0xA0
+BLOCK_ID = 0xA1
+
+# Containers whose children are scanned in place rather than skipped. This also
+# copes with the unknown-size Segment and Cluster elements MediaRecorder writes.
+MASTER_IDS = {SEGMENT_ID, INFO_ID, CLUSTER_ID, BLOCK_GROUP_ID}
+
+UNKNOWN_SIZE = -1
+DEFAULT_TIMECODE_SCALE = 1_000_000  # nanoseconds per timecode tick
+
+
+def _read_vint(data: bytes, pos: int, keep_marker: bool) -> Tuple[Optional[int], int]:
+    """Read an EBML variable-length integer; returns (value, new position)"""
+    if pos >= len(data):
+        return None, pos
+    first = data[pos]
+    length = 1
+    mask = 0x80
+    while length <= 8 and not first & mask:
+        mask >>= 1
+        length += 1
+    if length > 8 or pos + length > len(data):
+        return None, pos
+
+    value = first if keep_marker else first & (mask - 1)
+    all_ones = value == mask - 1
+    for byte in data[pos + 1:pos + length]:
+        value = (value << 8) | byte
+        all_ones = all_ones and byte == 0xFF
+    if not keep_marker and all_ones:
+        return UNKNOWN_SIZE, pos + length
+    return value, pos + length
+
+
+def opus_packet_duration(packet: bytes) -> float:
+    """
+    Duration in seconds of one Opus packet, from its TOC byte (RFC 6716, 3.1).
+    """
+    if not packet:
+        return 0.0
+    toc = packet[0]
+    config = toc >> 3
+    if config < 12:
+        frame_ms = (10, 20, 40, 60)[config % 4]
+    elif config < 16:
+        frame_ms = (10, 20)[config % 2]
+    else:
+        frame_ms = (2.5, 5, 10, 20)[config % 4]
+
+    code = toc & 0x03
+    if code == 0:
+        frames = 1
+    elif code in (1, 2):
+        frames = 2
+    else:
+        frames = packet[1] & 0x3F if len(packet) > 1 else 1
+    return frames * frame_ms / 1000.0
+
+
+def parse_webm_duration(data: bytes) -> Optional[float]:
+    """
+    Compute the audio duration covered by a WebM/Opus byte range.
+
+    Works on both complete files and the headerless cluster-only chunks that
+    MediaRecorder emits after the first timeslice. The durations of all Opus
+    packets are summed. Block timestamps can't be used here, because a
+    headerless chunk may start partway through a cluster whose timecode it
+    never sees. A Segment Info Duration is used only when no blocks are
+    present.
+
+    Returns:
+        Duration in seconds, or None if nothing could be parsed
+    """
+    timecode_scale = DEFAULT_TIMECODE_SCALE
+    info_duration = None
+    blocks = 0
+    total_seconds = 0.0
+
+    pos = 0
+    while pos < len(data):
+        element_id, body = _read_vint(data, pos, keep_marker=True)
+        if element_id is None:
+            break
+        size, body = _read_vint(data, body, keep_marker=False)
+        if size is None:
+            break
+
+        if element_id in MASTER_IDS or (element_id == TRACKS_ID and size == UNKNOWN_SIZE):
+            pos = body
+            continue
+        if size == UNKNOWN_SIZE or body + size > len(data):
+            # Truncated trailing element; blocks read so far are still valid
+            break
+
+        payload = data[body:body + size]
+        pos = body + size
+
+        if element_id == TIMECODE_SCALE_ID:
+            timecode_scale = int.from_bytes(payload, "big") or DEFAULT_TIMECODE_SCALE
+        elif element_id == DURATION_ID and size in (4, 8):
+            info_duration = struct.unpack(">f" if size == 4 else ">d", payload)[0]
+        elif element_id in (SIMPLE_BLOCK_ID, BLOCK_ID):
+            # Block header: track number, int16 relative timecode, flags
+            _, header_end = _read_vint(payload, 0, keep_marker=False)
+            if header_end + 3 > len(payload):
+                continue
+            blocks += 1
+            total_seconds += opus_packet_duration(payload[header_end + 3:])
+
+    if blocks:
+        return total_seconds
+    if info_duration is not None:
+        return info_duration * timecode_scale / 1e9
+    return None
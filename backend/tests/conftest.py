@@ -0,0 +1,55 @@
+import os
+import tempfile
+import uuid
+import pytest
+
+# Settings are read at import time, so point them at throwaway storage before
+# any application module is imported
+_scratch = tempfile.mkdtemp(prefix="scribe-tests-")
+os.environ.setdefault("MYSQL_URL", f"sqlite:///{os.path.join(_scratch, 'primary.db')}")
+os.environ.setdefault("AUDIO_STORAGE_PATH", os.path.join(_scratch, "audio"))
+os.environ.setdefault("MAINTENANCE_ENABLED", "false")
+
+
+@pytest.fixture(params=["mysql", "memory"])
+def repos(request):
+    """(user repository, recording repository) for each backend; "mysql" runs on SQLite"""
+    from database import SessionLocal, init_db
+    from repositories import (
+        InMemoryRecordingRepository, InMemoryStore, InMemoryUserRepository,
+        MySQLRecordingRepository, MySQLUserRepository
+    )
+
+    if request.param == "memory":
+        store = InMemoryStore()
+        yield InMemoryUserRepository(store), InMemoryRecordingRepository(store)
+        return
+    init_db()
+    db = SessionLocal()
+    try:
+        yield MySQLUserRepository(db), MySQLRecordingRepository(db)
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def user(repos):
+    user_repo, _ = repos
+    return user_repo.create_user(f"google-{uuid.uuid4()}", "user@example.com", "User", "")
+
+
+@pytest.fixture
+def api():
+    """(TestClient, auth headers) for a fresh user; "mysql" repositories on SQLite"""
+    from fastapi.testclient import TestClient
+    from database import SessionLocal, init_db
+    from main import app
+    from repositories import MySQLUserRepository
+    from services.auth_service import AuthService
+
+    init_db()
+    with SessionLocal() as db:
+        user_repo = MySQLUserRepository(db)
+        user = user_repo.create_user(f"google-{uuid.uuid4()}", "api@example.com", "API", "")
+        token = AuthService(user_repo).create_access_token(user.id)
+    return TestClient(app), {"Authorization": f"Bearer {token}"}
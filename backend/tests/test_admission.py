@@ -0,0 +1,58 @@
+import os
+import threading
+import time
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from database import MonitoredQueuePool
+from middleware.admission import CHUNK, CREATE, AdmissionController
+
+
+@pytest.fixture
+def pool(tmp_path):
+    """One-connection pool reporting to its own controller"""
+    controller = AdmissionController(max_pool_waiters=1, signal_ttl=0.5, storage_path=str(tmp_path))
+    engine = create_engine(
+        f"sqlite:///{os.path.join(tmp_path, 'pool.db')}",
+        poolclass=MonitoredQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.3
+    )
+    engine.pool.controller = controller
+    controller.watch_pool(lambda: engine.pool)
+    yield engine, controller
+    engine.dispose()
+
+
+def test_idle_pool_admits(pool):
+    _, controller = pool
+
+    assert controller.check(CHUNK) is None
+    assert controller.check(CREATE) is None
+
+
+def test_full_pool_sheds_new_recordings_only(pool):
+    engine, controller = pool
+
+    with engine.connect():
+        assert controller.pool_pressure()["in_use"] == 1
+        assert controller.check(CHUNK) is None
+        assert controller.check(CREATE)[0] == 503
+
+
+def test_waiters_shed_for_as_long_as_they_wait(pool):
+    engine, controller = pool
+    held = engine.connect()
+    waiter = threading.Thread(target=lambda: pytest.raises(PoolTimeoutError, engine.connect))
+    waiter.start()
+    time.sleep(0.1)
+
+    # No decay: the signal holds while the thread is still blocked
+    assert controller.pool_pressure()["waiters"] == 1
+    assert controller.check(CHUNK) == (503, "Database is saturated")
+
+    waiter.join()
+    held.close()
+    assert controller.pool_pressure()["timed_out"]
+    assert controller.check(CHUNK) == (503, "Database is saturated")
+
+    time.sleep(0.5)
+    assert controller.check(CHUNK) is None
@@ -0,0 +1,27 @@
+from database import SessionLocal
+from repositories import MySQLRecordingRepository
+
+
+def upload(client, headers, recording_id, index, content):
+    return client.post(
+        f"/recordings/{recording_id}/chunks",
+        data={"chunk_index": str(index)},
+        files={"audio_chunk": (f"chunk_{index}.webm", content, "audio/webm")},
+        headers=headers,
+    )
+
+
+def test_retried_upload_keeps_the_first_audio(api):
+    client, headers = api
+    recording_id = client.post("/recordings", headers=headers).json()["id"]
+
+    first = upload(client, headers, recording_id, 0, b"first upload")
+    retry = upload(client, headers, recording_id, 0, b"different bytes")
+    upload(client, headers, recording_id, 1, b"second chunk")
+
+    assert retry.json()["chunk_id"] == first.json()["chunk_id"]
+    with SessionLocal() as db:
+        chunks = MySQLRecordingRepository(db).get_chunks(recording_id)
+        assert [c.chunk_index for c in chunks] == [0, 1]
+        with open(chunks[0].audio_blob_path, "rb") as f:
+            assert f.read() == b"first upload"
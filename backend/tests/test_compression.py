@@ -0,0 +1,54 @@
+import asyncio
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from middleware.compression import CompressionMiddleware
+
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+
+@app.get("/large")
+async def large():
+    return {"text": "x" * 500}
+
+
+@app.get("/small")
+async def small():
+    return {"text": "x"}
+
+
+@app.get("/stream")
+async def stream():
+    async def lines():
+        for _ in range(3):
+            yield "y" * 200
+            await asyncio.sleep(0)
+    return StreamingResponse(lines(), media_type="text/plain")
+
+
+client = TestClient(app)
+
+
+def test_large_response_is_compressed_and_varies():
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.json() == {"text": "x" * 500}
+
+
+def test_uncompressed_responses_still_vary():
+    for path, encoding in [("/small", "gzip"), ("/large", "identity")]:
+        response = client.get(path, headers={"Accept-Encoding": encoding})
+
+        assert "content-encoding" not in response.headers
+        assert response.headers["vary"] == "Accept-Encoding"
+
+
+def test_streaming_response_passes_through():
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.text == "y" * 600
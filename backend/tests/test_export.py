@@ -0,0 +1,89 @@
+import io
+import json
+import tarfile
+import uuid
+import zipfile
+from datetime import date, datetime
+from database import SessionLocal, init_db
+from models import Recording
+from repositories import MySQLRecordingRepository, MySQLUserRepository
+from services.export_service import ExportService
+
+
+def export(client, headers, format, **params):
+    response = client.get("/recordings/export", headers=headers, params={"format": format, **params})
+    assert response.status_code == 200
+    return response.content
+
+
+def archive_names(content: bytes, format: str) -> dict:
+    """{archive name: bytes} for every member of an exported archive"""
+    if format == "zip":
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            assert archive.testzip() is None
+            return {name: archive.read(name) for name in archive.namelist()}
+    with tarfile.open(fileobj=io.BytesIO(content), mode="r:") as archive:
+        return {member.name: archive.extractfile(member).read() for member in archive.getmembers()}
+
+
+def ended_recording(client, headers, audio_path, transcription: str, created_at: datetime) -> str:
+    """Create a recording through the API, then end it with stored audio and a set creation time"""
+    recording_id = client.post("/recordings", headers=headers).json()["id"]
+    with SessionLocal() as db:
+        MySQLRecordingRepository(db).mark_ended(recording_id, str(audio_path), transcription)
+        db.query(Recording).filter(Recording.id == recording_id).update({"created_at": created_at})
+        db.commit()
+    return recording_id
+
+
+def test_exports_are_valid_archives_with_transcripts_and_audio(api, tmp_path):
+    client, headers = api
+    audio = tmp_path / "audio.wav"
+    audio.write_bytes(b"RIFF" + bytes(range(256)) * 64)
+    recording_id = ended_recording(client, headers, audio, "hello there", datetime(2024, 3, 1, 12))
+
+    for format in ExportService.FORMATS:
+        members = archive_names(export(client, headers, format), format)
+
+        folder = f"20240301-120000_{recording_id}"
+        assert members[f"{folder}/transcript.txt"] == b"hello there"
+        assert json.loads(members[f"{folder}/transcript.json"])["id"] == recording_id
+        assert members[f"{folder}/audio.wav"] == audio.read_bytes()
+
+
+def test_export_filters_by_creation_date(api, tmp_path):
+    client, headers = api
+    audio = tmp_path / "audio.wav"
+    audio.write_bytes(b"audio")
+    ids = {
+        day: ended_recording(client, headers, audio, f"day {day}", datetime(2024, 5, day, 23, 59))
+        for day in (1, 2, 3)
+    }
+
+    for format in ExportService.FORMATS:
+        members = archive_names(export(client, headers, format, start="2024-05-02", end="2024-05-02"), format)
+
+        exported = {name.split("/")[0].split("_", 1)[1] for name in members}
+        assert exported == {ids[2]}
+
+
+def test_unknown_export_format_is_rejected(api):
+    client, headers = api
+
+    assert client.get("/recordings/export", headers=headers, params={"format": "rar"}).status_code == 400
+
+
+def test_iter_recordings_loads_one_batch_at_a_time():
+    init_db()
+    with SessionLocal() as db:
+        user_id = MySQLUserRepository(db).create_user(f"google-{uuid.uuid4()}", "batch@example.com", "Batch", "").id
+        recording_repo = MySQLRecordingRepository(db)
+        created = [recording_repo.create_recording(user_id).id for _ in range(5)]
+        db.expunge_all()
+
+        recordings = recording_repo.iter_recordings(user_id, start=date.today(), batch_size=2)
+        first = next(recordings)
+
+        # yield_per: only the first batch is in the session so far
+        assert len(db.identity_map) == 2
+        assert [first.id] + [r.id for r in recordings] == created
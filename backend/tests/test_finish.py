@@ -0,0 +1,106 @@
+import asyncio
+import threading
+import time
+import pytest
+from sqlalchemy import update
+from config import settings
+from database import SessionLocal
+from llm.routing import RoutedTranscription
+from models import Recording
+from models.recording import RecordingStatus
+from services.recording_service import FinishInProgressError, RecordingService
+
+
+class StubRouter:
+    """Transcribes after a fixed delay"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    def transcribe(self, audio_path: str) -> RoutedTranscription:
+        time.sleep(self.latency)
+        return RoutedTranscription(text="hello", provider="stub")
+
+
+@pytest.fixture
+def recording(repos, user, tmp_path):
+    _, recording_repo = repos
+    recording = recording_repo.create_recording(user.id)
+    chunk_path = tmp_path / "0.webm"
+    chunk_path.write_bytes(b"audio")
+    recording_repo.add_chunk(recording.id, 0, str(chunk_path), duration=1.0)
+    return recording
+
+
+def test_refresh_does_not_commit_the_callers_transaction(repos, recording):
+    _, recording_repo = repos
+    if not hasattr(recording_repo, "db"):
+        pytest.skip("no transactions in the in-memory backend")
+    db = recording_repo.db
+    db.execute(update(Recording).where(Recording.id == recording.id).values(transcription_text="uncommitted"))
+
+    recording_repo.refresh_recording(recording.id)
+    db.rollback()
+
+    with SessionLocal() as other:
+        assert other.get(Recording, recording.id).transcription_text is None
+
+
+def test_renew_finish_only_while_finishing(repos, recording):
+    _, recording_repo = repos
+    assert not recording_repo.renew_finish(recording.id)
+
+    recording_repo.claim_finish(recording.id, stale_before=recording.created_at)
+    assert recording_repo.renew_finish(recording.id)
+
+    recording_repo.release_finish(recording.id, RecordingStatus.paused)
+    assert not recording_repo.renew_finish(recording.id)
+
+
+def test_lease_is_renewed_while_the_leader_works(repos, recording, monkeypatch):
+    _, recording_repo = repos
+    monkeypatch.setattr(settings, "FINISH_LEASE_SECONDS", 0.15)
+    renewals = []
+    renew = recording_repo.renew_finish
+    monkeypatch.setattr(recording_repo, "renew_finish", lambda rid: renewals.append(rid) or renew(rid))
+
+    finished = RecordingService(recording_repo, StubRouter(latency=0.3)).finish_recording(recording.id)
+
+    assert finished.status == RecordingStatus.ended
+    assert len(renewals) >= 2
+
+
+def test_waiter_times_out_while_another_worker_holds_the_lease(repos, recording, monkeypatch):
+    _, recording_repo = repos
+    monkeypatch.setattr(settings, "FINISH_WAIT_TIMEOUT_SECONDS", 0.2)
+    monkeypatch.setattr(settings, "FINISH_POLL_INTERVAL_SECONDS", 0.05)
+    recording_repo.claim_finish(recording.id, stale_before=recording.created_at)
+
+    with pytest.raises(FinishInProgressError):
+        asyncio.run(RecordingService(recording_repo, StubRouter()).finish_or_wait(recording.id))
+
+
+def test_waiter_returns_once_the_other_worker_ends_it(repos, recording, monkeypatch):
+    _, recording_repo = repos
+    monkeypatch.setattr(settings, "FINISH_POLL_INTERVAL_SECONDS", 0.05)
+    recording_repo.claim_finish(recording.id, stale_before=recording.created_at)
+    recording_repo.release_connection()
+
+    def other_worker():
+        time.sleep(0.2)
+        if hasattr(recording_repo, "db"):
+            with SessionLocal() as db:
+                db.execute(
+                    update(Recording).where(Recording.id == recording.id)
+                    .values(status=RecordingStatus.ended, transcription_text="theirs")
+                )
+                db.commit()
+        else:
+            recording_repo.mark_ended(recording.id, "/audio.wav", "theirs")
+
+    worker = threading.Thread(target=other_worker)
+    worker.start()
+    finished = asyncio.run(RecordingService(recording_repo, StubRouter()).finish_or_wait(recording.id))
+    worker.join()
+
+    assert (finished.status, finished.transcription_text) == (RecordingStatus.ended, "theirs")
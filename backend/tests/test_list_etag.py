@@ -0,0 +1,31 @@
+from tests.test_chunk_upload import upload
+
+
+def list_recordings(client, headers, etag=None):
+    if etag:
+        headers = {**headers, "If-None-Match": etag}
+    return client.get("/recordings", headers=headers)
+
+
+def test_unchanged_list_is_not_modified(api):
+    client, headers = api
+    client.post("/recordings", headers=headers)
+    etag = list_recordings(client, headers).headers["etag"]
+
+    assert list_recordings(client, headers, etag).status_code == 304
+
+
+def test_every_listed_change_moves_the_etag(api):
+    client, headers = api
+    recording_id = client.post("/recordings", headers=headers).json()["id"]
+    etags = [list_recordings(client, headers).headers["etag"]]
+
+    for change in (
+        lambda: upload(client, headers, recording_id, 0, b"audio"),
+        lambda: client.patch(f"/recordings/{recording_id}/pause", headers=headers),
+        lambda: client.post("/recordings", headers=headers),
+    ):
+        change()
+        response = list_recordings(client, headers, etags[-1])
+        assert response.status_code == 200
+        etags.append(response.headers["etag"])
@@ -0,0 +1,62 @@
+from contextlib import contextmanager
+from config import settings
+from models.recording import RecordingStatus
+from services.maintenance_service import MaintenanceReport, MaintenanceService, MaintenanceWorker
+from services.recording_service import RecordingService
+
+
+class UnusedRouter:
+    def transcribe(self, audio_path: str):
+        raise AssertionError("nothing should be transcribed")
+
+
+def make_service(recording_repo) -> MaintenanceService:
+    return MaintenanceService(recording_repo, RecordingService(recording_repo, UnusedRouter()))
+
+
+def test_reaper_fails_recordings_whose_chunk_files_are_gone(repos, user, monkeypatch):
+    _, recording_repo = repos
+    monkeypatch.setattr(settings, "MAINTENANCE_IDLE_TTL_SECONDS", -60)
+    monkeypatch.setattr(settings, "MAINTENANCE_FINISH_INTERVAL_SECONDS", 0)
+    recording = recording_repo.create_recording(user.id)
+    recording_repo.add_chunk(recording.id, 0, "/missing/0.webm", duration=1.0)
+
+    report = MaintenanceReport()
+    make_service(recording_repo).reap_stale_recordings(report)
+
+    assert (report.failed, report.finalized) == (1, 0)
+    assert recording_repo.get_recording(recording.id).status == RecordingStatus.failed
+
+
+def test_dangling_rows_are_pruned_only_while_recording(repos, user, tmp_path):
+    _, recording_repo = repos
+    ended = recording_repo.create_recording(user.id)
+    recording_repo.add_chunk(ended.id, 0, str(tmp_path / "gone-0.webm"), duration=1.0, peaks=b"\x01")
+    recording_repo.mark_ended(ended.id, str(tmp_path / "audio.wav"), "text")
+    # A late upload that raced the finish, not yet compacted
+    recording_repo.add_chunk(ended.id, 1, str(tmp_path / "gone-1.webm"), duration=1.0, peaks=b"\x02")
+    active = recording_repo.create_recording(user.id)
+    recording_repo.add_chunk(active.id, 0, str(tmp_path / "gone-2.webm"), duration=1.0)
+
+    report = MaintenanceReport()
+    make_service(recording_repo).collect_dangling_rows(report)
+
+    assert report.dangling_chunk_rows_removed >= 1
+    assert recording_repo.get_chunks(active.id) == []
+    # The ended recording keeps the peaks and durations its waveform is drawn from
+    chunks = recording_repo.get_chunks(ended.id)
+    assert [(c.chunk_index, c.duration_seconds, c.peaks) for c in chunks] == [(0, 1.0, b"\x01"), (1, 1.0, b"\x02")]
+
+
+def test_worker_skips_the_pass_without_the_lock():
+    @contextmanager
+    def held_elsewhere():
+        yield False
+
+    def factory():
+        raise AssertionError("the pass should not start")
+
+    worker = MaintenanceWorker(factory, lock=held_elsewhere)
+
+    assert worker.run_once() is None
+    assert worker.last_report is None
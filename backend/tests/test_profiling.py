@@ -0,0 +1,99 @@
+import threading
+import time
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from config import settings
+from middleware.profiling import (
+    ProfileStore, ProfilingMiddleware, RequestProfile, _active_profile, install_sql_listeners
+)
+
+
+def test_failed_statement_leaves_no_start_time():
+    install_sql_listeners()
+    engine = create_engine("sqlite://")
+    token = _active_profile.set(RequestProfile("GET", "/"))
+    try:
+        with engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM missing_table"))
+            conn.execute(text("SELECT 1"))
+
+            assert conn.info["profile_query_start"] == []
+    finally:
+        _active_profile.reset(token)
+
+
+def stored_profile(store, response) -> RequestProfile:
+    deadline = time.monotonic() + 2.0
+    while store.get(response.headers["x-profile-id"]) is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return store.get(response.headers["x-profile-id"])
+
+
+def test_profiled_request_is_stored_by_the_sampler(monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_TOKEN", "secret")
+    store = ProfileStore(5)
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, store=store)
+
+    @app.get("/work")
+    def work():
+        time.sleep(0.05)
+        return {}
+
+    response = TestClient(app).get("/work", headers={"X-Profile-Token": "secret"})
+
+    profile = stored_profile(store, response)
+    assert profile.status_code == 200
+    assert profile.duration_ms >= 50
+
+
+def test_concurrent_requests_stay_out_of_the_profile(monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_TOKEN", "secret")
+    store = ProfileStore(5)
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, store=store)
+
+    def profiled_work():
+        time.sleep(0.3)
+
+    def other_work():
+        time.sleep(0.2)
+
+    def loop_hog():
+        time.sleep(0.1)
+
+    @app.get("/work")
+    def work():
+        profiled_work()
+        return {}
+
+    @app.get("/other")
+    def other():
+        other_work()
+        return {}
+
+    @app.get("/hog")
+    async def hog():
+        # Blocks the shared event loop while the profiled request waits on its thread
+        loop_hog()
+        return {}
+
+    with TestClient(app) as client:
+        def neighbours():
+            time.sleep(0.05)
+            client.get("/other")
+            client.get("/hog")
+
+        thread = threading.Thread(target=neighbours)
+        thread.start()
+        response = client.get("/work", headers={"X-Profile-Token": "secret"})
+        thread.join()
+
+    folded = stored_profile(store, response).folded()
+    assert "profiled_work" in folded
+    assert "other_work" not in folded
+    assert "loop_hog" not in folded
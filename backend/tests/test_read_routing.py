@@ -0,0 +1,59 @@
+import os
+import uuid
+import time
+import pytest
+from sqlalchemy import create_engine
+import database
+from database import Base, ReplicaPool, SessionLocal, StickyWrites, init_db
+from repositories import MySQLRecordingRepository, MySQLUserRepository
+
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch):
+    """An empty replica database, i.e. one that has not caught up with any write"""
+    url = f"sqlite:///{os.path.join(tmp_path, 'replica.db')}"
+    Base.metadata.create_all(bind=create_engine(url))
+    monkeypatch.setattr(database, "replicas", ReplicaPool([url], check_interval=0))
+    monkeypatch.setattr(database, "sticky_writes", StickyWrites(window=0.3))
+    init_db()
+
+
+def open_repository(sticky_key=None) -> MySQLRecordingRepository:
+    db = SessionLocal()
+    if sticky_key:
+        db.info["sticky_key"] = sticky_key
+    return MySQLRecordingRepository(db)
+
+
+def create_recording():
+    db = SessionLocal()
+    try:
+        user = MySQLUserRepository(db).create_user(f"google-{uuid.uuid4()}", "r@example.com", "R", "")
+        db.info["sticky_key"] = user.id
+        recording = MySQLRecordingRepository(db).create_recording(user.id)
+        return user.id, recording.id
+    finally:
+        db.close()
+
+
+def test_writer_reads_its_writes_within_the_window(replica):
+    user_id, recording_id = create_recording()
+
+    assert open_repository(sticky_key=user_id).get_recording(recording_id) is not None
+    # Anyone else reads the lagging replica
+    assert open_repository().get_recording(recording_id) is None
+
+
+def test_reads_move_to_the_replica_after_the_window(replica):
+    user_id, recording_id = create_recording()
+    time.sleep(0.4)
+
+    assert open_repository(sticky_key=user_id).get_recording(recording_id) is None
+
+
+def test_dead_replica_falls_back_to_the_primary(replica, tmp_path, monkeypatch):
+    dead = f"sqlite:///{os.path.join(tmp_path, 'missing', 'replica.db')}"
+    monkeypatch.setattr(database, "replicas", ReplicaPool([dead], check_interval=0))
+    _, recording_id = create_recording()
+
+    assert open_repository().get_recording(recording_id) is not None
@@ -0,0 +1,84 @@
+import time
+from datetime import datetime
+import pytest
+from models import RecordingChunk
+from models.types import new_id
+
+
+def test_retried_chunk_upload_is_stored_and_billed_once(repos, user):
+    _, recording_repo = repos
+    recording = recording_repo.create_recording(user.id)
+
+    first = recording_repo.add_chunk(recording.id, 0, "/chunks/0.webm", duration=10.0)
+    retry = recording_repo.add_chunk(recording.id, 0, "/chunks/0.webm", duration=10.0)
+
+    assert retry.id == first.id
+    assert len(recording_repo.get_chunks(recording.id)) == 1
+    assert recording_repo.get_recording(recording.id).duration_seconds == pytest.approx(10.0)
+    [rollup] = recording_repo.get_usage(user.id)
+    assert (rollup.audio_seconds, rollup.chunk_count) == (pytest.approx(10.0), 1)
+
+
+def test_late_chunk_rows_merge_with_the_manifest(repos, user):
+    _, recording_repo = repos
+    recording = recording_repo.create_recording(user.id)
+    for index in (0, 2):
+        recording_repo.add_chunk(recording.id, index, f"/chunks/{index}.webm", duration=1.0)
+    recording_repo.mark_ended(recording.id, "/audio.wav", "text")
+
+    # An upload that raced the finish is left as a row until maintenance compacts it
+    late = RecordingChunk(
+        id=new_id(), recording_id=recording.id, chunk_index=1,
+        audio_blob_path="/chunks/1.webm", duration_seconds=1.0, uploaded_at=datetime.utcnow()
+    )
+    if hasattr(recording_repo, "db"):
+        recording_repo.db.add(late)
+        recording_repo.db.commit()
+    else:
+        recording_repo.store.put_chunk(late)
+
+    chunks = recording_repo.get_chunks(recording.id)
+    assert [c.chunk_index for c in chunks] == [0, 1, 2]
+    assert chunks[1].audio_blob_path == "/chunks/1.webm"
+
+
+def test_memory_uploads_do_not_slow_as_chunks_accumulate():
+    from repositories import InMemoryRecordingRepository, InMemoryStore, InMemoryUserRepository
+
+    store = InMemoryStore()
+    user = InMemoryUserRepository(store).create_user("google-scale", "scale@example.com", "Scale", "")
+    recording_repo = InMemoryRecordingRepository(store)
+    recording = recording_repo.create_recording(user.id)
+
+    def upload(indexes):
+        started = time.perf_counter()
+        for index in indexes:
+            recording_repo.add_chunk(recording.id, index, f"/chunks/{index}.webm", duration=1.0)
+        return time.perf_counter() - started
+
+    # A whole-store scan per upload makes the last batch ~10x slower than the first
+    first = upload(range(500))
+    upload(range(500, 5500))
+    last = upload(range(5500, 6000))
+    assert last < first * 3
+
+
+def test_memory_indexes_follow_deletes():
+    from repositories import InMemoryRecordingRepository, InMemoryStore, InMemoryUserRepository
+
+    store = InMemoryStore()
+    user = InMemoryUserRepository(store).create_user("google-index", "index@example.com", "Index", "")
+    recording_repo = InMemoryRecordingRepository(store)
+    kept, dropped = recording_repo.create_recording(user.id), recording_repo.create_recording(user.id)
+    for recording in (kept, dropped):
+        for index in range(3):
+            recording_repo.add_chunk(recording.id, index, f"/chunks/{recording.id}/{index}.webm")
+
+    recording_repo.delete_chunks([recording_repo.get_chunk(kept.id, 1).id])
+    recording_repo.delete_recording(dropped.id)
+
+    assert [c.chunk_index for c in recording_repo.get_chunks(kept.id)] == [0, 2]
+    assert recording_repo.get_chunk(kept.id, 1) is None
+    assert [r.id for r in recording_repo.list_recordings(user.id)] == [kept.id]
+    assert set(store.chunks_by_recording) == {kept.id}
+    assert set(store.recordings_by_user[user.id]) == {kept.id}
@@ -0,0 +1,101 @@
+import uuid
+from datetime import date, datetime, timedelta
+from database import SessionLocal, init_db
+from models.recording import RecordingStatus
+from repositories import (
+    InMemoryRecordingRepository, InMemoryStore, InMemoryUserRepository,
+    MySQLRecordingRepository, MySQLUserRepository
+)
+
+
+def scenario(user_repo, recording_repo) -> list:
+    """
+    Drive a repository pair through the recording lifecycle and return what
+    it observed, with generated IDs replaced by stable labels.
+    """
+    labels = {}
+
+    def label(value):
+        if value is None:
+            return None
+        return labels.setdefault(str(value), f"id{len(labels)}")
+
+    def chunks(recording_id):
+        return [
+            (c.chunk_index, c.audio_blob_path, c.duration_seconds, c.peaks)
+            for c in recording_repo.get_chunks(recording_id)
+        ]
+
+    def recording_state(recording):
+        return (label(recording.id), label(recording.user_id), recording.status, recording.duration_seconds,
+                recording.audio_file_path, recording.transcription_text, recording.llm_provider)
+
+    seen = []
+    google_id = f"google-{uuid.uuid4()}"
+    user = user_repo.create_user(google_id, "a@example.com", "A", "")
+    seen.append(("user", label(user.id), user.email, recording_repo.get_collection_version(user.id)))
+    seen.append(("by google id", label(user_repo.get_user_by_google_id(google_id).id)))
+    seen.append(("missing user", user_repo.get_user_by_id(str(uuid.uuid4()))))
+    updated = user_repo.update_user(user.id, display_name="Renamed")
+    seen.append(("updated", updated.display_name, user_repo.get_user_by_id(user.id).display_name))
+
+    first = recording_repo.create_recording(user.id)
+    second = recording_repo.create_recording(user.id)
+    ids = {first.id, second.id}
+    seen.append(("created", recording_state(first), recording_state(second)))
+    seen.append(("listed", [label(r.id) for r in recording_repo.list_recordings(user.id)]))
+    seen.append(("iterated", [label(r.id) for r in recording_repo.iter_recordings(user.id, start=date.today())]))
+    seen.append(("iterated before", [label(r.id) for r in recording_repo.iter_recordings(user.id, end=date.today() - timedelta(days=1))]))
+
+    version = recording_repo.get_recording_version(first.id)[1]
+    recording_repo.add_chunk(first.id, 1, "/c/1.webm", duration=2.5, peaks=b"\x01\x02")
+    recording_repo.add_chunk(first.id, 0, "/c/0.webm", duration=1.5)
+    recording_repo.add_chunk(first.id, 0, "/c/0.webm", duration=1.5)
+    seen.append(("version bumped", recording_repo.get_recording_version(first.id)[1] - version))
+    seen.append(("chunks", chunks(first.id)))
+    seen.append(("chunk 1", recording_repo.get_chunk(first.id, 1).audio_blob_path, recording_repo.get_chunk(first.id, 5)))
+    seen.append(("usage", [(u.audio_seconds, u.chunk_count) for u in recording_repo.get_usage(user.id)]))
+    seen.append(("chunk files", sorted(p for _, p in recording_repo.iter_chunk_files() if p.startswith("/c/"))))
+
+    seen.append(("paused", recording_state(recording_repo.mark_paused(first.id))))
+    long_ago = datetime.utcnow() - timedelta(days=1)
+    seen.append(("claimed", recording_repo.claim_finish(first.id, long_ago)))
+    seen.append(("not claimable under a live lease", recording_repo.claim_finish(first.id, long_ago)))
+    seen.append(("renewed", recording_repo.renew_finish(first.id)))
+    recording_repo.release_finish(first.id, RecordingStatus.paused)
+    seen.append(("released", recording_repo.get_recording(first.id).status))
+    soon = datetime.utcnow() + timedelta(seconds=60)
+    seen.append(("stale", sorted(label(r.id) for r in recording_repo.list_stale_recordings(soon, soon, 100) if r.id in ids)))
+
+    recording_repo.claim_finish(first.id, long_ago)
+    ended = recording_repo.mark_ended(first.id, "/a/first.wav", "hello", llm_provider="stub")
+    seen.append(("ended", recording_state(ended)))
+    seen.append(("compacted chunks", chunks(first.id)))
+    seen.append(("uncompacted", [label(i) for i in recording_repo.list_uncompacted_recordings(1000) if i in ids]))
+    seen.append(("chunk files once ended", sorted(p for _, p in recording_repo.iter_chunk_files() if p.startswith("/c/"))))
+    seen.append(("audio files", [label(r) for r, _ in recording_repo.iter_audio_files() if r in ids]))
+    recording_repo.clear_audio_file(first.id)
+    seen.append(("cleared", recording_repo.get_recording(first.id).audio_file_path))
+
+    seen.append(("failed", recording_state(recording_repo.mark_failed(second.id))))
+    seen.append(("existing", sorted(label(i) for i in recording_repo.existing_recording_ids([first.id, str(uuid.uuid4())]))))
+    seen.append(("deleted", recording_repo.delete_recording(second.id), recording_repo.delete_recording(second.id)))
+    seen.append(("gone", recording_repo.get_recording(second.id), recording_repo.get_recording_version(second.id)))
+
+    seen.append(("collection", recording_repo.get_collection_version(user.id)[:2]))
+    return seen
+
+
+def test_memory_and_mysql_repositories_behave_alike():
+    init_db()
+    db = SessionLocal()
+    try:
+        mysql = scenario(MySQLUserRepository(db), MySQLRecordingRepository(db))
+    finally:
+        db.close()
+    store = InMemoryStore()
+    memory = scenario(InMemoryUserRepository(store), InMemoryRecordingRepository(store))
+
+    for mysql_step, memory_step in zip(mysql, memory):
+        assert memory_step == mysql_step
+    assert len(memory) == len(mysql)
@@ -0,0 +1,116 @@
+import threading
+import time
+import pytest
+from llm.routing import LatencyTracker, ProviderRouter, TranscriptionError, parse_weights
+
+
+class FakeProvider:
+    """Provider with a scripted latency and outcome that records its calls"""
+
+    def __init__(self, name: str, latency: float = 0.0, fail: bool = False):
+        self.name = name
+        self.latency = latency
+        self.fail = fail
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def transcribe_audio(self, audio_path: str) -> str:
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        if self.fail:
+            raise RuntimeError(f"{self.name} unavailable")
+        return f"{self.name}: {audio_path}"
+
+
+def make_router(*providers, **kwargs) -> ProviderRouter:
+    return ProviderRouter({p.name: p for p in providers}, **kwargs)
+
+
+def test_failover_tries_providers_in_order():
+    first, second, third = FakeProvider("a", fail=True), FakeProvider("b"), FakeProvider("c")
+    router = make_router(first, second, third)
+
+    result = router.transcribe("x.wav")
+
+    assert result.provider == "b"
+    assert result.text == "b: x.wav"
+    assert (first.calls, second.calls, third.calls) == (1, 1, 0)
+
+
+def test_failover_raises_with_every_error_when_all_fail():
+    router = make_router(FakeProvider("a", fail=True), FakeProvider("b", fail=True))
+
+    with pytest.raises(TranscriptionError) as excinfo:
+        router.transcribe("x.wav")
+
+    assert [name for name, _ in excinfo.value.errors] == ["a", "b"]
+
+
+def test_hedged_fast_primary_never_starts_backup():
+    primary, backup = FakeProvider("a", latency=0.01), FakeProvider("b")
+    router = make_router(primary, backup, policy="hedged", hedge_default_delay=0.5)
+
+    assert router.transcribe("x.wav").provider == "a"
+    assert backup.calls == 0
+
+
+def test_hedged_slow_primary_is_raced_by_backup():
+    primary, backup = FakeProvider("a", latency=1.0), FakeProvider("b", latency=0.01)
+    router = make_router(primary, backup, policy="hedged", hedge_default_delay=0.05)
+
+    started = time.monotonic()
+    result = router.transcribe("x.wav")
+
+    assert result.provider == "b"
+    assert time.monotonic() - started < 0.5
+    assert primary.calls == 1
+
+
+def test_hedged_failure_launches_next_provider_immediately():
+    primary, backup = FakeProvider("a", fail=True), FakeProvider("b")
+    router = make_router(primary, backup, policy="hedged", hedge_default_delay=5.0)
+
+    started = time.monotonic()
+    assert router.transcribe("x.wav").provider == "b"
+    assert time.monotonic() - started < 1.0
+
+
+def test_hedged_raises_when_all_fail():
+    router = make_router(FakeProvider("a", fail=True), FakeProvider("b", fail=True), policy="hedged")
+
+    with pytest.raises(TranscriptionError) as excinfo:
+        router.transcribe("x.wav")
+
+    assert sorted(name for name, _ in excinfo.value.errors) == ["a", "b"]
+
+
+def test_hedge_delay_uses_p95_once_enough_samples():
+    tracker = LatencyTracker()
+    router = make_router(
+        FakeProvider("a"), FakeProvider("b"),
+        policy="hedged", hedge_min_samples=20, hedge_default_delay=7.0, latency_tracker=tracker
+    )
+    for _ in range(19):
+        tracker.record("a", 0.1)
+    assert router.hedge_delay("a") == 7.0
+
+    # 90 fast calls and 10 slow ones: p95 lands among the slow ones
+    for i in range(81):
+        tracker.record("a", 0.1 if i < 71 else 2.0)
+    assert router.hedge_delay("a") == pytest.approx(2.0)
+
+
+def test_weights_pick_primary_and_keep_failover_order():
+    router = make_router(FakeProvider("a"), FakeProvider("b"), FakeProvider("c"), weights={"a": 1e-12, "c": 1e12})
+
+    assert router.provider_order() == ["c", "a", "b"]
+
+
+def test_parse_weights():
+    assert parse_weights("a=3, b=1,,c") == {"a": 3.0, "b": 1.0, "c": 1.0}
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        make_router(FakeProvider("a"), policy="fastest")
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+from config import settings
+from database import SessionLocal
+from repositories import MySQLRecordingRepository
+from services.waveform_service import WaveformService
+
+
+def pairs(*values) -> np.ndarray:
+    return np.array(values, dtype=np.int8).reshape(-1, 2)
+
+
+def test_compute_peaks_takes_min_and_max_per_window():
+    service = WaveformService(sample_rate=8, peaks_per_second=2)
+    samples = np.array([0.0, -0.5, 1.0, 0.25, -1.0, 0.0, 0.5, 0.1], dtype=np.float32)
+
+    assert service.compute_peaks(samples).tolist() == [[-64, 127], [-127, 64]]
+
+
+def test_compute_peaks_pads_a_short_last_window_with_its_edge():
+    service = WaveformService(sample_rate=8, peaks_per_second=2)
+    samples = np.array([0.5, -0.5, 0.0, 0.0, 0.25, 0.75], dtype=np.float32)
+
+    # The last window holds only 0.25 and 0.75; repeating 0.75 keeps 0 out of its min
+    assert service.compute_peaks(samples).tolist() == [[-64, 64], [32, 95]]
+
+
+def test_compute_peaks_of_no_samples_is_empty():
+    service = WaveformService(sample_rate=8, peaks_per_second=2)
+
+    assert service.compute_peaks(np.zeros(0, dtype=np.float32)).shape == (0, 2)
+
+
+def test_downsample_merges_groups_into_min_of_mins_and_max_of_maxes():
+    peaks = pairs(-1, 1, -5, 2, -2, 7, -3, 3)
+
+    assert WaveformService.downsample_peaks(peaks, 2).tolist() == [[-5, 2], [-3, 7]]
+    assert WaveformService.downsample_peaks(peaks, 1) is peaks
+
+
+def test_downsample_pads_an_odd_length_with_the_last_pair():
+    peaks = pairs(-1, 1, -5, 2, -2, 7)
+
+    assert WaveformService.downsample_peaks(peaks, 2).tolist() == [[-5, 2], [-2, 7]]
+
+
+def test_merge_concatenates_chunks_in_order_and_skips_missing_peaks():
+    service = WaveformService()
+    chunks = [pairs(-1, 1).tobytes(), None, pairs(-2, 2, -3, 3).tobytes()]
+
+    assert service.merge_peaks(chunks).tolist() == [[-1, 1], [-2, 2], [-3, 3]]
+    assert service.merge_peaks([None, b""]).shape == (0, 2)
+
+
+@pytest.mark.parametrize("total, max_peaks, length", [
+    (100, 100, 100),  # already within the bound
+    (100, 50, 50),    # factor 2
+    (100, 40, 25),    # 2.5 rounds up to 4
+    (100, 30, 25),    # 3.33 rounds up to 4
+    (100, 12, 7),     # 8.33 rounds up to 16; 100 pads to 112
+    (1000, 1, 1),
+])
+def test_merge_reduces_by_a_power_of_two_to_at_most_max_peaks(total, max_peaks, length):
+    service = WaveformService()
+    peaks = np.arange(total * 2).reshape(-1, 2) % 100
+    chunks = [peaks[:total // 2].astype(np.int8).tobytes(), peaks[total // 2:].astype(np.int8).tobytes()]
+
+    merged = service.merge_peaks(chunks, max_peaks)
+
+    assert len(merged) == length <= max_peaks
+
+
+def test_peaks_endpoint_scales_peaks_per_second_to_the_reduction(api):
+    client, headers = api
+    recording_id = client.post("/recordings", headers=headers).json()["id"]
+    with SessionLocal() as db:
+        recording_repo = MySQLRecordingRepository(db)
+        for index in range(3):
+            recording_repo.add_chunk(recording_id, index, f"/chunks/{index}.webm", peaks=pairs(*[-1, 1] * 100).tobytes())
+
+    full = client.get(f"/recordings/{recording_id}/peaks", headers=headers).json()
+    reduced = client.get(f"/recordings/{recording_id}/peaks", headers=headers, params={"max_peaks": 100}).json()
+
+    assert (full["length"], full["peaks_per_second"]) == (300, settings.WAVEFORM_PEAKS_PER_SECOND)
+    # 300 pairs by a factor of 4: 75 pairs, each covering 4 base pairs
+    assert reduced["length"] == 75
+    assert reduced["peaks_per_second"] == pytest.approx(settings.WAVEFORM_PEAKS_PER_SECOND / 4)
+    assert len(reduced["peaks"]) == 2 * 75
+    assert client.get(f"/recordings/{recording_id}/peaks", headers=headers, params={"max_peaks": 0}).status_code == 400
@@ -0,0 +1,55 @@
+import struct
+import pytest
+from services.webm_parser import opus_packet_duration, parse_webm_duration
+
+
+CLUSTER_UNKNOWN_SIZE = b"\x1f\x43\xb6\x75" + b"\x01\xff\xff\xff\xff\xff\xff\xff"
+
+# TOC byte for a single 20ms SILK frame (config 1, code 0)
+OPUS_20MS = bytes([1 << 3]) + b"\x00" * 20
+
+
+def element(element_id: bytes, payload: bytes) -> bytes:
+    return element_id + b"\x01" + len(payload).to_bytes(7, "big") + payload
+
+
+def simple_block(relative_ms: int, packet: bytes = OPUS_20MS) -> bytes:
+    return element(b"\xa3", b"\x81" + struct.pack(">h", relative_ms) + b"\x80" + packet)
+
+
+def cluster(timecode_ms: int, blocks: int) -> bytes:
+    timecode = element(b"\xe7", timecode_ms.to_bytes(4, "big"))
+    return CLUSTER_UNKNOWN_SIZE + timecode + b"".join(simple_block(i * 20) for i in range(blocks))
+
+
+def test_opus_packet_duration():
+    assert opus_packet_duration(OPUS_20MS) == pytest.approx(0.02)
+    # CELT 10ms, code 3 with 4 frames
+    assert opus_packet_duration(bytes([(18 << 3) | 3, 4])) == pytest.approx(0.04)
+    assert opus_packet_duration(b"") == 0.0
+
+
+def test_duration_of_whole_clusters():
+    assert parse_webm_duration(cluster(0, 50) + cluster(1000, 50)) == pytest.approx(2.0)
+
+
+def test_chunk_starting_mid_cluster():
+    # 10s of blocks from a cluster opened in the previous chunk, then two new clusters
+    tail = b"".join(simple_block(10000 + i * 20) for i in range(500))
+    data = tail + cluster(30000, 250) + cluster(60000, 250)
+
+    assert parse_webm_duration(data) == pytest.approx(20.0)
+
+
+def test_truncated_trailing_block_is_ignored():
+    data = cluster(0, 10)
+    assert parse_webm_duration(data + simple_block(200)[:-5]) == pytest.approx(0.2)
+
+
+def test_info_duration_used_without_blocks():
+    info = element(b"\x15\x49\xa9\x66", element(b"\x44\x89", struct.pack(">d", 1500.0)))
+    assert parse_webm_duration(info) == pytest.approx(1.5)
+
+
+def test_garbage_returns_none():
+    assert parse_webm_duration(b"") is None
@@ -36,8 +36,12 @@ function RecordingList({ recordings, loading, onSelect, selectedRecording }) {
         return '#52c41a';
       case 'paused':
         return '#faad14';
+      case 'finishing':
+        return '#722ed1';
       case 'ended':
         return '#1890ff';
+      case 'failed':
+        return '#f5222d';
       default:
         return '#d9d9d9';
     }
@@ -12,10 +12,13 @@ function RecordingView({ recording, onRecordingComplete }) {
   const { token, API_URL } = useAuth();
   const [isRecording, setIsRecording] = useState(false);
   const [isPaused, setIsPaused] = useState(false);
-  const [chunkIndex, setChunkIndex] = useState(0);
   const mediaRecorderRef = useRef(null);
   const audioChunksRef = useRef([]);
   const streamRef = useRef(null);
+  const pendingUploadsRef = useRef([]);
+  // A ref, not state: ondataavailable is bound once in startRecording and would
+  // otherwise see the initial index for every chunk
+  const chunkIndexRef = useRef(0);
 
   useEffect(() => {
     // Cleanup on unmount
@@ -41,8 +44,9 @@ function RecordingView({ recording, onRecordingComplete }) {
           
           // Upload chunk to backend
           const blob = new Blob([event.data], { type: 'audio/webm' });
-          await uploadChunk(blob, chunkIndex);
-          setChunkIndex(prev => prev + 1);
+          const upload = uploadChunk(blob, chunkIndexRef.current++);
+          pendingUploadsRef.current.push(upload);
+          await upload;
         }
       };
 
@@ -109,6 +113,11 @@ function RecordingView({ recording, onRecordingComplete }) {
 
   const stopRecording = async () => {
     if (mediaRecorderRef.current) {
+      // The final chunk is emitted on stop; wait for it before finishing,
+      // since the backend rejects chunks once a recording is finishing
+      const stopped = new Promise(resolve => {
+        mediaRecorderRef.current.onstop = resolve;
+      });
       mediaRecorderRef.current.stop();
       setIsRecording(false);
       setIsPaused(false);
@@ -120,6 +129,9 @@ function RecordingView({ recording, onRecordingComplete }) {
       // Finish recording on backend
       try {
         message.loading('Processing transcription...', 0);
+        await stopped;
+        await Promise.all(pendingUploadsRef.current);
+        pendingUploadsRef.current = [];
         await axios.post(
           `${API_URL}/recordings/${recording.id}/finish`,
           {},